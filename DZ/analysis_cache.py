@@ -0,0 +1,117 @@
+"""
+Постоянный кеш результатов разбора модулей для инкрементального анализа
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Результаты разбора по относительному пути файла.
+    Запись считается актуальной, если совпадают размер и mtime; при изменении
+    только mtime файл перечитывается и сверяется по SHA-256. Весь кеш
+    сбрасывается при смене версии анализатора.
+    """
+
+    def __init__(self, cache_file: str, project_path: str, analyzer_version: str):
+        self.cache_file = cache_file
+        self.project_path = project_path
+        self.analyzer_version = analyzer_version
+        self.entries: Dict[str, Tuple[int, int, str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            print(f"⚠️  Кеш анализа поврежден, будет пересоздан: {self.cache_file}")
+            return
+
+        if data.get('version') == self.analyzer_version and data.get('project_path') == self.project_path:
+            self.entries = data['entries']
+        else:
+            self._dirty = True
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.project_path)
+
+    def lookup(self, file_path: str) -> Optional[Any]:
+        """Сохраненный результат разбора или None, если файл изменился"""
+        key = self._key(file_path)
+        stat = os.stat(file_path)
+        self._stats[key] = (stat.st_size, stat.st_mtime_ns)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            size, mtime_ns, stored_hash, result = entry
+            if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                self.hits += 1
+                return result
+
+            # Файл тронут (checkout, touch), но содержимое может быть прежним
+            if size == stat.st_size:
+                with open(file_path, 'rb') as f:
+                    if content_hash(f.read()) == stored_hash:
+                        self.entries[key] = (size, stat.st_mtime_ns, stored_hash, result)
+                        self._dirty = True
+                        self.hits += 1
+                        return result
+
+        self.misses += 1
+        return None
+
+    def store(self, file_path: str, file_hash: str, result: Any) -> None:
+        """Сохранение результата с размером и mtime, снятыми при lookup"""
+        key = self._key(file_path)
+        stat = self._stats.get(key)
+        if stat is None:
+            st = os.stat(file_path)
+            stat = (st.st_size, st.st_mtime_ns)
+        self.entries[key] = (stat[0], stat[1], file_hash, result)
+        self._dirty = True
+
+    def forget(self, file_path: str) -> None:
+        """Удаление записи об одном файле"""
+        if self.entries.pop(self._key(file_path), None) is not None:
+            self._dirty = True
+
+    def prune(self, file_paths: Iterable[str]) -> int:
+        """Удаление записей об удаленных файлах"""
+        alive = {self._key(file_path) for file_path in file_paths}
+        removed = [key for key in self.entries if key not in alive]
+        for key in removed:
+            del self.entries[key]
+        if removed:
+            self._dirty = True
+        return len(removed)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({
+                'version': self.analyzer_version,
+                'project_path': self.project_path,
+                'entries': self.entries
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_file)
+        self._dirty = False
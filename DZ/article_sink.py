@@ -0,0 +1,154 @@
+"""
+Потоковая запись статей в JSONL с постоянным индексом уже сохраненных
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+from DZ.articles import matches_keywords
+
+
+def article_key(article: Dict) -> Optional[str]:
+    """Ключ для дедупликации: id статьи, иначе URL"""
+    if article.get('id'):
+        return f"id:{article['id']}"
+    if article.get('url'):
+        return f"url:{article['url']}"
+    return None
+
+
+class SeenIndex:
+    """Индекс сохраненных статей: файл с одним ключом на строку, только дозапись"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.keys: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.keys.update(line.rstrip('\n') for line in f if line.strip())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class JsonlArticleSink:
+    """
+    Запись статей по мере извлечения: фильтрация по ключевым словам,
+    пропуск уже сохраненных (в том числе в прошлых запусках) и пакетная
+    запись с fsync, чтобы падение не теряло уже обработанные страницы.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None,
+                 keywords: Optional[List[str]] = None, batch_size: int = 50):
+        self.path = path
+        self.index_path = index_path or f"{os.path.splitext(path)[0]}.seen"
+        self.keywords = keywords
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.index = SeenIndex(self.index_path)
+        self._buffer: List[str] = []
+        self._buffer_keys: List[str] = []
+        self._file = open(path, 'a', encoding='utf-8')
+        self._index_file = open(self.index_path, 'a', encoding='utf-8')
+        self._lock = asyncio.Lock()
+        # Поток из flush_async продолжает запись и после отмены задачи, поэтому
+        # сами файлы защищены блокировкой потоков, а не только asyncio.Lock
+        self._write_lock = threading.Lock()
+
+        self.written = 0
+        self.duplicates = 0
+        self.filtered = 0
+
+    def add(self, article: Dict) -> bool:
+        """Добавление статьи в буфер; False, если статья отфильтрована или уже есть"""
+        if self.keywords and not matches_keywords(article, self.keywords):
+            self.filtered += 1
+            return False
+
+        key = article_key(article)
+        if key is not None:
+            if key in self.index:
+                self.duplicates += 1
+                return False
+            self.index.keys.add(key)
+            self._buffer_keys.append(key)
+
+        self._buffer.append(json.dumps(article, ensure_ascii=False))
+        return True
+
+    async def add_many(self, articles: Iterable[Dict]) -> int:
+        """Добавление статей страницы; запись на диск вне цикла событий при заполнении пакета"""
+        added = sum(1 for article in articles if self.add(article))
+        if len(self._buffer) >= self.batch_size:
+            await self.flush_async()
+        return added
+
+    def _take_buffer(self):
+        lines, self._buffer = self._buffer, []
+        keys, self._buffer_keys = self._buffer_keys, []
+        return lines, keys
+
+    def flush(self) -> None:
+        """Запись буфера и индекса с fsync"""
+        self._write(*self._take_buffer())
+
+    def _write(self, lines: List[str], keys: List[str]) -> None:
+        if not lines:
+            return
+
+        with self._write_lock:
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+            # Индекс пишется после данных: при сбое статья может повториться, но не потеряться
+            if keys:
+                self._index_file.write('\n'.join(keys) + '\n')
+                self._index_file.flush()
+                os.fsync(self._index_file.fileno())
+
+            self.written += len(lines)
+
+    async def flush_async(self) -> None:
+        # Буфер забирается в цикле событий, в поток уходит только запись
+        batch = self._take_buffer()
+        async with self._lock:
+            await asyncio.to_thread(self._write, *batch)
+
+    def close(self) -> None:
+        """Синхронное закрытие; ждет незавершенную запись из flush_async"""
+        self.flush()
+        with self._write_lock:
+            self._file.close()
+            self._index_file.close()
+        self.logger.info(f"JSONL: записано {self.written}, дубликатов {self.duplicates}, "
+                         f"отфильтровано {self.filtered}")
+
+    async def aclose(self) -> None:
+        """Закрытие из цикла событий: после пакетов flush_async и без fsync в цикле"""
+        async with self._lock:
+            await asyncio.to_thread(self.close)
+
+    def stats(self) -> Dict:
+        return {
+            'path': self.path,
+            'written': self.written,
+            'duplicates': self.duplicates,
+            'filtered': self.filtered,
+            'seen_total': len(self.index)
+        }
+
+    def print_statistics(self) -> None:
+        print(f"💾 JSONL: {self.path} (новых статей: {self.written}, "
+              f"повторов пропущено: {self.duplicates}, отфильтровано: {self.filtered})")
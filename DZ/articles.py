@@ -0,0 +1,32 @@
+"""
+Общие операции над извлеченными статьями, независимые от способа загрузки страницы
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def matches_keywords(article: Dict, keywords: List[str]) -> bool:
+    """Проверка статьи на наличие хотя бы одного ключевого слова"""
+    text = ' '.join([
+        article.get('title') or '',
+        article.get('preview') or '',
+        ' '.join(article.get('hubs') or [])
+    ]).lower()
+    return any(keyword.lower() in text for keyword in keywords)
+
+
+def build_articles_data(source_url: str, articles: List[Dict],
+                        keywords: Optional[List[str]] = None) -> Dict:
+    """Фильтрация статей и формирование результата в формате save_to_json"""
+    total_found = len(articles)
+    if keywords:
+        articles = [a for a in articles if matches_keywords(a, keywords)]
+
+    return {
+        'source_url': source_url,
+        'extracted_at': datetime.now().isoformat(),
+        'keywords': keywords or [],
+        'total_found': total_found,
+        'articles': articles
+    }
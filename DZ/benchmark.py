@@ -0,0 +1,527 @@
+"""
+Бенчмарки анализатора кода и извлечения статей: синтетические проекты,
+время и память по фазам, воспроизведение страниц с локального сервера
+и сравнение с сохраненным эталоном
+"""
+
+import asyncio
+import contextlib
+import functools
+import io
+import os
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from DZ.cli_options import DEFAULT_TOLERANCE
+from DZ.code_analyzer import CodeDocumentationGenerator
+from DZ.import_graph import ImportGraph
+from DZ.metrics import percentile
+
+ANALYZER_PHASES = ['analyze', 'dependency', 'markdown', 'json', 'uml']
+# Части фазы analyze, накопленные генератором по файлам
+FILE_PHASES = ['walk', 'parse', 'extract']
+ANALYZER_SCENARIOS = ['no_cache', 'warm_cache']
+
+# Абсолютные изменения ниже этих порогов считаются шумом измерения
+NOISE_FLOOR = {'seconds': 0.002, 'ms': 2.0, 'kb': 64.0}
+
+STDLIB_IMPORTS = ['os', 'sys', 'json', 'typing', 'logging', 'datetime', 'collections', 'functools']
+EXTERNAL_IMPORTS = ['requests', 'lxml', 'yaml', 'numpy']
+
+
+def generate_project(root: str, files: int = 100, classes: int = 3, functions: int = 5,
+                     methods: int = 4, fanout: int = 3, package_size: int = 20, seed: int = 0) -> Dict[str, int]:
+    """
+    Синтетический Python-проект: пакеты pkg_NNN по package_size модулей,
+    в каждом модуле классы с методами, функции (в том числе async и с
+    декораторами) и fanout импортов соседних модулей - абсолютных и относительных.
+    """
+    rng = random.Random(seed)
+    names = [(f"pkg_{index // package_size:03d}", f"mod_{index:05d}") for index in range(files)]
+
+    for package, _ in names:
+        package_dir = os.path.join(root, package)
+        if not os.path.isdir(package_dir):
+            os.makedirs(package_dir)
+            with open(os.path.join(package_dir, '__init__.py'), 'w', encoding='utf-8') as f:
+                f.write('')
+
+    for index, (package, module) in enumerate(names):
+        lines = [f'"""Синтетический модуль {package}.{module}"""', '']
+        lines += [f"import {name}" for name in rng.sample(STDLIB_IMPORTS, 2)]
+        lines.append(f"import {rng.choice(EXTERNAL_IMPORTS)}")
+        for target in rng.sample(range(files), min(fanout, files)):
+            if target == index:
+                continue
+            target_package, target_module = names[target]
+            if target_package == package:
+                lines.append(f"from .{target_module} import Class0")
+            else:
+                lines.append(f"from {target_package} import {target_module}")
+        lines.append('')
+
+        for class_index in range(classes):
+            base = f"(Class{class_index - 1})" if class_index else ''
+            lines += ['', f"class Class{class_index}{base}:", f'    """Класс {class_index} модуля {module}"""', '']
+            for method_index in range(methods):
+                prefix = 'async def' if method_index % 3 == 2 else 'def'
+                if method_index % 4 == 1:
+                    lines.append('    @property')
+                    lines.append(f"    {prefix} method_{method_index}(self):")
+                else:
+                    lines.append(f"    {prefix} method_{method_index}(self, value, scale=2):")
+                lines += [f'        """Метод {method_index}"""',
+                          '        def helper(item):',
+                          '            return item * 2',
+                          '        return helper(1)', '']
+
+        for function_index in range(functions):
+            prefix = 'async def' if function_index % 4 == 3 else 'def'
+            lines += ['', f"{prefix} function_{function_index}(first, second=None, *args, **kwargs):",
+                      f'    """Функция {function_index}"""',
+                      '    total = 0',
+                      '    for item in args:',
+                      '        total += item',
+                      '    return total', '']
+
+        with open(os.path.join(root, package, f"{module}.py"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+
+    return {'files': files, 'classes': classes, 'functions': functions, 'methods': methods,
+            'fanout': fanout, 'package_size': package_size, 'seed': seed}
+
+
+def _measure(fn: Callable[[], Any], trace_memory: bool) -> Tuple[Any, float, int]:
+    """Выполнение фазы: (результат, секунды, пик памяти в байтах)"""
+    if trace_memory:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - before if trace_memory else 0
+    return result, elapsed, peak
+
+
+def _run_analyzer_once(project_path: str, output_dir: str, trace_memory: bool, jobs: int = 1,
+                       cache_file: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Один прогон анализа методами самого генератора: обход и разбор
+    (_walk_directory с кешем и пулом процессов), зависимости и граф импортов,
+    затем генерация документации. Время обхода, разбора и извлечения внутри
+    analyze генератор накапливает сам в generator.timings.
+    """
+    results: Dict[str, Any] = {}
+
+    def phase(name: str, fn: Callable[[], Any]) -> Any:
+        value, elapsed, peak = _measure(fn, trace_memory)
+        results[name] = (elapsed, peak)
+        return value
+
+    def analyze() -> CodeDocumentationGenerator:
+        # Загрузка кеша с диска - часть стоимости повторного анализа
+        generator = CodeDocumentationGenerator(project_path, jobs=jobs, cache_file=cache_file)
+        generator.timings = {}
+        generator._walk_directory()
+        return generator
+
+    def build_dependencies() -> None:
+        generator._generate_dependencies()
+        generator.graph = ImportGraph.from_model(generator.model)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = phase('analyze', analyze)
+        phase('dependency', build_dependencies)
+        phase('markdown', lambda: generator.generate_markdown_docs(output_dir))
+        phase('json', lambda: generator.generate_json_structure(output_dir))
+        phase('uml', lambda: generator.generate_uml_diagram(output_dir))
+
+    for name in FILE_PHASES:
+        results[name] = (generator.timings.get(name, 0.0), 0)
+    results['_counts'] = generator.model.counts()
+    results['_cache_hits'] = generator.cache.hits if generator.cache else 0
+    return results
+
+
+def _benchmark_scenario(project_path: str, output_dir: str, repeat: int, jobs: int,
+                        cache_file: Optional[str]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """Замер фаз в одном режиме кеша: (результаты, число модулей и функций)"""
+    timings: Dict[str, List[float]] = {name: [] for name in ANALYZER_PHASES + FILE_PHASES}
+    for _ in range(repeat):
+        run = _run_analyzer_once(project_path, output_dir, False, jobs, cache_file)
+        for name in timings:
+            timings[name].append(run[name][0])
+
+    tracemalloc.start()
+    try:
+        memory_run = _run_analyzer_once(project_path, output_dir, True, jobs, cache_file)
+    finally:
+        tracemalloc.stop()
+
+    phases = {
+        name: {
+            'seconds': round(min(timings[name]), 6),
+            'seconds_median': round(statistics.median(timings[name]), 6),
+            'peak_kb': round(memory_run[name][1] / 1024, 1)
+        }
+        for name in ANALYZER_PHASES
+    }
+    # Пик памяти по частям analyze не разделить: только время
+    file_phases = {
+        name: {
+            'seconds': round(min(timings[name]), 6),
+            'seconds_median': round(statistics.median(timings[name]), 6)
+        }
+        for name in FILE_PHASES
+    }
+    return {
+        'cache_hits': memory_run['_cache_hits'],
+        'phases': phases,
+        'analyze_parts': file_phases,
+        'total_seconds': round(sum(phase['seconds'] for phase in phases.values()), 6)
+    }, memory_run['_counts']
+
+
+def benchmark_analyzer(project_path: str, repeat: int = 3, jobs: int = 1) -> Dict[str, Any]:
+    """
+    Время и пиковая память каждой фазы анализа без кеша и с прогретым
+    кешем разбора; для analyze отдельно время обхода (walk), разбора (parse)
+    и извлечения (extract), при jobs > 1 суммарное по процессам. Время - минимум и медиана по repeat прогонам без
+    трассировки; память - отдельный прогон с tracemalloc, чтобы трассировка
+    не искажала время (память дочерних процессов при jobs > 1 не учитывается).
+    """
+    work_dir = tempfile.mkdtemp(prefix='bench_docs_')
+    try:
+        output_dir = os.path.join(work_dir, 'docs')
+        cache_file = os.path.join(work_dir, '.analysis_cache.pickle')
+        no_cache, counts = _benchmark_scenario(project_path, output_dir, repeat, jobs, None)
+
+        # Прогрев: первый прогон заполняет кеш, замеряются следующие
+        _run_analyzer_once(project_path, output_dir, False, jobs, cache_file)
+        warm_cache, _ = _benchmark_scenario(project_path, output_dir, repeat, jobs, cache_file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'counts': counts,
+        'repeat': repeat,
+        'jobs': jobs,
+        'scenarios': {'no_cache': no_cache, 'warm_cache': warm_cache}
+    }
+
+
+def generate_habr_pages(root: str, pages: int = 20, articles: int = 20, seed: int = 0) -> List[str]:
+    """Синтетические страницы ленты с разметкой Habr; возвращает имена файлов"""
+    rng = random.Random(seed)
+    hubs = ['Python', 'JavaScript', 'DevOps', 'Машинное обучение', 'Алгоритмы', 'Браузеры']
+    filenames = []
+    for page in range(1, pages + 1):
+        parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Лента</title></head>'
+                 '<body><div class="tm-articles-list">']
+        for number in range(articles):
+            article_id = page * 1000 + number
+            article_hubs = ''.join(f'<a class="tm-publication-hub__link" href="#"><span>{hub}</span><span>*</span></a>'
+                                   for hub in rng.sample(hubs, 2))
+            parts.append(
+                f'<article id="{article_id}" class="tm-articles-list__item">'
+                f'<a class="tm-user-info__username" href="/ru/users/u{number}/">user{number}</a>'
+                f'<time datetime="2024-01-{number % 28 + 1:02d}T10:00:00.000Z">сегодня</time>'
+                f'<h2><a class="tm-title__link" href="/ru/articles/{article_id}/"><span>Статья {article_id}</span></a></h2>'
+                f'<div class="tm-publication-hubs">{article_hubs}</div>'
+                f'<div class="article-formatted-body">{"Текст превью статьи. " * 20}</div>'
+                f'</article>'
+            )
+        parts.append('</div></body></html>')
+        filename = f"page{page}.html"
+        with open(os.path.join(root, filename), 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
+        filenames.append(filename)
+    return filenames
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def static_server(directory: str):
+    """Локальный HTTP-сервер для сохраненных страниц; отдает базовый URL"""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _latency_summary(latencies: List[float], elapsed: float, articles: int, failed: int) -> Dict[str, Any]:
+    return {
+        'pages': len(latencies),
+        'failed': failed,
+        'articles': articles,
+        'elapsed_seconds': round(elapsed, 4),
+        'pages_per_second': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms_p50': round(percentile(latencies, 50) * 1000, 2),
+        'latency_ms_p95': round(percentile(latencies, 95) * 1000, 2),
+        'latency_ms_max': round(max(latencies, default=0.0) * 1000, 2)
+    }
+
+
+async def _benchmark_http(urls: List[str], concurrency: int) -> Dict[str, Any]:
+    from DZ.http_extractor import HttpArticleExtractor
+
+    extractor = HttpArticleExtractor()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    counters = {'articles': 0, 'failed': 0}
+
+    async def fetch(url: str) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            data = await extractor.extract_articles_data(url)
+            latencies.append(time.perf_counter() - started)
+            if data is None:
+                counters['failed'] += 1
+            else:
+                counters['articles'] += len(data['articles'])
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(fetch(url) for url in urls))
+    finally:
+        extractor.close()
+    return _latency_summary(latencies, time.perf_counter() - started, counters['articles'], counters['failed'])
+
+
+async def _benchmark_browser(urls: List[str]) -> Dict[str, Any]:
+    # Playwright загружается только для этого замера
+    from DZ.habr_automation import HabrAutomation
+    from DZ.metrics import MetricsRegistry
+    from DZ.navigation import AdaptiveNavigator
+
+    metrics = MetricsRegistry()
+    automation = HabrAutomation(navigator=AdaptiveNavigator(stats_file=None), metrics=metrics)
+    latencies: List[float] = []
+    articles = failed = 0
+    try:
+        await automation.setup_browser(headless=True)
+        started = time.perf_counter()
+        for url in urls:
+            page_started = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    await automation.navigate_to_site(url, fallback=False)
+                data = await automation.extract_articles_data()
+                articles += len(data['articles'])
+            except Exception:
+                failed += 1
+            latencies.append(time.perf_counter() - page_started)
+        elapsed = time.perf_counter() - started
+    finally:
+        await automation.close()
+
+    result = _latency_summary(latencies, elapsed, articles, failed)
+    phases = metrics.to_dict()['histograms'].get('phase_duration_seconds', [])
+    result['phases'] = {
+        item['labels']['phase']: {'count': item['count'], 'avg_ms': round(item['avg'] * 1000, 2)}
+        for item in phases if 'phase' in item['labels']
+    }
+    return result
+
+
+def benchmark_scraper(pages_dir: Optional[str] = None, pages: int = 20, articles: int = 20,
+                      rounds: int = 3, concurrency: int = 4, browser: bool = False) -> Dict[str, Any]:
+    """
+    Извлечение статей со страниц, отдаваемых локальным сервером: сохраненных
+    страниц Habr из pages_dir или синтетических. Браузерный замер - по запросу.
+    """
+    temp_dir = None
+    if pages_dir:
+        filenames = sorted(name for name in os.listdir(pages_dir) if name.endswith(('.html', '.htm')))
+    else:
+        pages_dir = temp_dir = tempfile.mkdtemp(prefix='bench_pages_')
+        filenames = generate_habr_pages(pages_dir, pages, articles)
+
+    try:
+        with static_server(pages_dir) as base_url:
+            urls = [base_url + name for name in filenames] * rounds
+            result: Dict[str, Any] = {'source_pages': len(filenames), 'rounds': rounds,
+                                      'http': asyncio.run(_benchmark_http(urls, concurrency))}
+            if browser:
+                try:
+                    result['browser'] = asyncio.run(_benchmark_browser(urls[:len(filenames)]))
+                except Exception as e:
+                    result['browser'] = {'skipped': f"браузер недоступен: {e}"}
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return result
+
+
+def flatten_metrics(results: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Числовые метрики результатов с путями вида
+    analyzer.scenarios.no_cache.phases.analyze.seconds или scraper.http.latency_ms_p95
+    """
+    flat: Dict[str, float] = {}
+
+    def walk(prefix: str, value: Any) -> None:
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(f"{prefix}.{key}" if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = float(value)
+
+    walk('', {key: value for key, value in results.items() if key in ('analyzer', 'scraper')})
+    return flat
+
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith('per_second')
+
+
+def _is_comparable(metric: str) -> bool:
+    return (metric.endswith(('seconds', 'seconds_median', '_kb', 'per_second'))
+            or '.latency_ms_' in metric or metric.endswith('avg_ms'))
+
+
+def _noise_floor(metric: str) -> float:
+    if metric.endswith('_kb'):
+        return NOISE_FLOOR['kb']
+    if metric.endswith('_ms') or '.latency_ms_' in metric:
+        return NOISE_FLOOR['ms']
+    if 'seconds' in metric and not metric.endswith('per_second'):
+        return NOISE_FLOOR['seconds']
+    return 0.0
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                          tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Сравнение с эталоном: список метрик с изменением и флагом регрессии.
+    Метрики эталона, которых нет в текущем прогоне, попадают в список
+    с флагом missing.
+    """
+    current = flatten_metrics(results)
+    reference = flatten_metrics(baseline)
+    comparison = []
+    for metric in sorted(set(current) & set(reference)):
+        if not _is_comparable(metric) or not reference[metric]:
+            continue
+        change = (current[metric] - reference[metric]) / reference[metric]
+        worse = -change if _higher_is_better(metric) else change
+        noticeable = abs(current[metric] - reference[metric]) > _noise_floor(metric)
+        comparison.append({
+            'metric': metric,
+            'baseline': reference[metric],
+            'current': current[metric],
+            'change': round(change, 4),
+            'regression': worse > tolerance and noticeable,
+            'missing': False
+        })
+    for metric in sorted(set(reference) - set(current)):
+        if _is_comparable(metric):
+            comparison.append({'metric': metric, 'baseline': reference[metric], 'current': None,
+                               'change': None, 'regression': False, 'missing': True})
+    return comparison
+
+
+def comparison_failed(comparison: List[Dict[str, Any]]) -> bool:
+    """Регрессия или ни одной общей метрики: эталон старого формата не должен проходить молча"""
+    compared = [item for item in comparison if not item['missing']]
+    return not compared or any(item['regression'] for item in compared)
+
+
+def run_benchmarks(project_path: Optional[str] = None, synthetic: Optional[Dict[str, int]] = None,
+                   repeat: int = 3, scraper: Optional[Dict[str, Any]] = None, jobs: int = 1) -> Dict[str, Any]:
+    """Полный прогон: анализатор на проекте (или синтетическом) и при необходимости извлечение статей"""
+    results: Dict[str, Any] = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        }
+    }
+
+    if project_path is not None or synthetic is not None:
+        temp_dir = None
+        if project_path is None:
+            temp_dir = tempfile.mkdtemp(prefix='bench_project_')
+            results['meta']['synthetic_project'] = generate_project(temp_dir, **synthetic)
+            project_path = temp_dir
+        else:
+            results['meta']['project_path'] = os.path.abspath(project_path)
+        try:
+            results['analyzer'] = benchmark_analyzer(project_path, repeat, jobs)
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if scraper is not None:
+        results['scraper'] = benchmark_scraper(**scraper)
+
+    return results
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    analyzer = results.get('analyzer')
+    if analyzer:
+        counts = analyzer['counts']
+        print(f"🧪 Анализатор: {counts['modules']} модулей, {counts['classes']} классов, "
+              f"{counts['functions'] + counts['methods']} функций и методов, процессов: {analyzer['jobs']}")
+        for scenario_name in ANALYZER_SCENARIOS:
+            scenario = analyzer['scenarios'][scenario_name]
+            title = 'без кеша' if scenario_name == 'no_cache' else f"кеш прогрет, попаданий {scenario['cache_hits']}"
+            print(f"   {title}:")
+            for name, phase in scenario['phases'].items():
+                print(f"     {name:<11} {phase['seconds'] * 1000:9.1f} мс (медиана {phase['seconds_median'] * 1000:.1f}), "
+                      f"пик памяти {phase['peak_kb']:.0f} КБ")
+                if name == 'analyze':
+                    for part_name, part in scenario['analyze_parts'].items():
+                        print(f"       {part_name:<9} {part['seconds'] * 1000:9.1f} мс "
+                              f"(медиана {part['seconds_median'] * 1000:.1f})")
+            print(f"     всего       {scenario['total_seconds'] * 1000:9.1f} мс")
+
+    scraper = results.get('scraper')
+    if scraper:
+        for backend in ('http', 'browser'):
+            data = scraper.get(backend)
+            if not data:
+                continue
+            if 'skipped' in data:
+                print(f"🌐 {backend}: пропущено ({data['skipped']})")
+                continue
+            print(f"🌐 {backend}: {data['pages']} страниц, {data['pages_per_second']} стр/с, "
+                  f"p50 {data['latency_ms_p50']} мс, p95 {data['latency_ms_p95']} мс, ошибок {data['failed']}")
+
+
+def print_comparison(comparison: List[Dict[str, Any]]) -> None:
+    compared = [item for item in comparison if not item['missing']]
+    missing = [item for item in comparison if item['missing']]
+    for item in compared:
+        mark = '🔴' if item['regression'] else '  '
+        print(f"{mark} {item['metric']}: {item['baseline']:g} -> {item['current']:g} ({item['change']:+.1%})")
+    if missing:
+        print(f"⚠️  Метрик эталона нет в текущем прогоне: {len(missing)}")
+        for item in missing:
+            print(f"   {item['metric']}")
+    regressions = sum(1 for item in compared if item['regression'])
+    if not compared:
+        print("❌ Нет ни одной общей метрики с эталоном: эталон записан другой версией бенчмарка")
+    elif regressions:
+        print(f"❌ Регрессий: {regressions}")
+    else:
+        print("✅ Регрессий относительно эталона нет")
@@ -0,0 +1,242 @@
+"""
+Пул браузеров и контекстов Playwright для повторного использования между задачами
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import List, Optional
+
+# Общие параметры запуска, чтобы пул и HabrAutomation создавали одинаковые браузеры
+BROWSER_ARGS = [
+    '--window-size=1280,720',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-blink-features=AutomationControlled',
+    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+]
+
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1280, 'height': 720},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class BrowserLease:
+    """Контекст браузера, выданный из пула"""
+
+    def __init__(self, slot: 'BrowserSlot', context):
+        self.slot = slot
+        self.context = context
+        self.pages_served = 0
+
+    async def new_page(self):
+        """Открытие новой страницы в арендованном контексте"""
+        page = await self.context.new_page()
+        page.set_default_timeout(30000)
+        page.set_default_navigation_timeout(40000)
+        self.pages_served += 1
+        self.slot.pages_served += 1
+        return page
+
+
+class BrowserSlot:
+    """Один процесс Chromium в пуле"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.pages_served = 0
+        # Выданные контексты; браузер перезапускается только когда их не осталось
+        self.active_leases = 0
+        # После лимита страниц слот не выдает новых контекстов до перезапуска
+        self.draining = False
+        self.parked: List[BrowserLease] = []
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Пул прогретых браузеров фиксированного размера.
+    Контексты выдаются через acquire/release, проверяются перед выдачей
+    и пересоздаются после обслуживания заданного числа страниц. Браузер,
+    исчерпавший лимит страниц, перестает выдавать контексты и
+    перезапускается, когда вернется последний из них.
+    """
+
+    def __init__(self, size: int = 2, contexts_per_browser: int = 2,
+                 max_pages_per_context: int = 20, max_pages_per_browser: int = 200,
+                 headless: bool = True):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_pages_per_context = max_pages_per_context
+        self.max_pages_per_browser = max_pages_per_browser
+        self.headless = headless
+        self.logger = logging.getLogger(__name__)
+
+        self.playwright = None
+        self.slots: List[BrowserSlot] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self) -> None:
+        """Запуск Playwright и всех браузеров пула"""
+        async with self._start_lock:
+            if not self._started:
+                await self._start()
+
+    async def _start(self) -> None:
+        # Playwright загружается только при запуске браузеров, а не при импорте модуля
+        from playwright.async_api import async_playwright
+
+        self.logger.info(f"Запуск пула браузеров (size={self.size}, contexts={self.contexts_per_browser})...")
+        self.playwright = await async_playwright().start()
+        self._idle = asyncio.Queue()
+
+        try:
+            for index in range(self.size):
+                slot = BrowserSlot(index)
+                await self._launch(slot)
+                self.slots.append(slot)
+                for _ in range(self.contexts_per_browser):
+                    context = await slot.browser.new_context(**CONTEXT_OPTIONS)
+                    self._idle.put_nowait(BrowserLease(slot, context))
+        except Exception:
+            # Иначе Playwright остается запущенным и стартует заново при каждом acquire
+            await self.close()
+            raise
+
+        self._started = True
+        self.logger.info("Пул браузеров запущен")
+
+    async def _launch(self, slot: BrowserSlot) -> None:
+        """Запуск (или перезапуск) браузера в слоте"""
+        slot.browser = await self.playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_ARGS,
+            timeout=60000
+        )
+        slot.pages_served = 0
+
+    async def _restart_slot(self, slot: BrowserSlot) -> None:
+        """Перезапуск браузера: старые контексты становятся недействительными"""
+        self.logger.info(f"Перезапуск браузера #{slot.index} (обслужено страниц: {slot.pages_served})")
+        try:
+            if slot.browser and slot.browser.is_connected():
+                await slot.browser.close()
+        except Exception as e:
+            self.logger.warning(f"Ошибка при закрытии браузера #{slot.index}: {e}")
+        await self._launch(slot)
+
+    async def acquire(self) -> BrowserLease:
+        """Получение свободного контекста; ожидает, если все заняты"""
+        if not self._started:
+            await self.start()
+
+        while True:
+            lease = await self._idle.get()
+            if not lease.slot.draining:
+                break
+            # Слот ждет перезапуска: контекст вернется в очередь после него
+            lease.slot.parked.append(lease)
+
+        # Проверка здоровья перед выдачей
+        async with self._lock:
+            if not lease.slot.is_healthy():
+                self.logger.warning(f"Браузер #{lease.slot.index} недоступен, перезапуск")
+                await self._restart_slot(lease.slot)
+            if lease.context.browser is not lease.slot.browser:
+                lease = BrowserLease(lease.slot, await lease.slot.browser.new_context(**CONTEXT_OPTIONS))
+            lease.slot.active_leases += 1
+
+        return lease
+
+    def _requeue_parked(self, slot: BrowserSlot) -> None:
+        slot.draining = False
+        for parked in slot.parked:
+            self._idle.put_nowait(parked)
+        slot.parked = []
+
+    async def release(self, lease: BrowserLease, healthy: bool = True) -> None:
+        """
+        Возврат контекста в пул с пересозданием по лимитам страниц.
+        Неисправный контекст (healthy=False или не закрываются страницы)
+        заменяется новым; если упал сам браузер, слот уходит на перезапуск.
+        """
+        slot = lease.slot
+        slot.active_leases -= 1
+        if healthy:
+            try:
+                for page in list(lease.context.pages):
+                    await page.close()
+            except Exception as e:
+                self.logger.warning(f"Контекст браузера #{slot.index} не отвечает, будет пересоздан: {e}")
+                healthy = False
+
+        try:
+            async with self._lock:
+                if not healthy:
+                    with suppress(Exception):
+                        await lease.context.close()
+                    if not slot.is_healthy():
+                        # Перезапуск, когда вернутся остальные контексты слота
+                        slot.draining = True
+                if slot.pages_served >= self.max_pages_per_browser:
+                    slot.draining = True
+                if slot.draining:
+                    if slot.active_leases > 0:
+                        # Другие контексты слота еще работают: ждем их возврата
+                        slot.parked.append(lease)
+                        return
+                    await self._restart_slot(slot)
+                    self._requeue_parked(slot)
+
+                if not healthy or lease.context.browser is not lease.slot.browser or \
+                        lease.pages_served >= self.max_pages_per_context:
+                    if healthy:
+                        with suppress(Exception):
+                            await lease.context.close()
+                    lease = BrowserLease(lease.slot, await lease.slot.browser.new_context(**CONTEXT_OPTIONS))
+
+        except Exception as e:
+            self.logger.warning(f"Ошибка при возврате контекста в пул: {e}")
+            if slot.draining and not slot.active_leases:
+                # Перезапуск не удался: браузер перезапустит проверка здоровья в acquire
+                self._requeue_parked(slot)
+            try:
+                lease = BrowserLease(lease.slot, await lease.slot.browser.new_context(**CONTEXT_OPTIONS))
+            except Exception:
+                # Браузер мертв: контекст будет пересоздан при следующем acquire
+                pass
+
+        self._idle.put_nowait(lease)
+
+    @asynccontextmanager
+    async def lease(self):
+        """Асинхронный контекстный менеджер для acquire/release"""
+        lease = await self.acquire()
+        try:
+            yield lease
+        finally:
+            await self.release(lease)
+
+    async def close(self) -> None:
+        """Остановка всех браузеров и Playwright"""
+        for slot in self.slots:
+            try:
+                if slot.browser:
+                    await slot.browser.close()
+            except Exception as e:
+                self.logger.error(f"Ошибка при закрытии браузера #{slot.index}: {e}")
+
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+        self.slots = []
+        self._started = False
+        self.logger.info("Пул браузеров остановлен")
@@ -0,0 +1,32 @@
+"""
+Варианты и значения по умолчанию аргументов командной строки.
+Модуль без зависимостей: main.py строит по нему парсер, не загружая
+модули подкоманд, а сами модули берут константы отсюда же.
+"""
+
+import os
+
+# Предустановки фильтра ресурсов: блокируемые типы и блокировка трекеров (resource_filter)
+PRESETS = {
+    'full': {'resource_types': set(), 'block_trackers': False},
+    'no-trackers': {'resource_types': set(), 'block_trackers': True},
+    'no-media': {'resource_types': {'image', 'media', 'font'}, 'block_trackers': True},
+    'text-only': {'resource_types': {'image', 'media', 'font', 'stylesheet', 'websocket', 'manifest'},
+                  'block_trackers': True},
+}
+
+# Режимы кеша ответов (http_cache)
+CACHE_MODES = ['off', 'record', 'replay']
+
+# Форматы и области скриншотов (screenshots)
+SCREENSHOT_FORMATS = ['png', 'jpeg', 'webp']
+SCREENSHOT_MODES = ['full', 'viewport', 'element']
+
+# Форматы файла графа импортов (import_graph)
+GRAPH_FORMATS = ['dot', 'json', 'puml']
+
+# Допустимое ухудшение метрик относительно эталона (benchmark)
+DEFAULT_TOLERANCE = 0.2
+
+# Страница оплаты для нагрузочного теста (payment_load_test)
+PAYMENT_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payment_system.html')
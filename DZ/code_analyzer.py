@@ -1,27 +1,186 @@
 import ast
 import os
-import subprocess
+import time
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple, Union
+from DZ.analysis_cache import AnalysisCache, content_hash
+from DZ.code_model import CodeModel, ModuleRecord, FunctionRecord, ClassRecord, ImportRef, module_name_from_path
+from DZ.import_graph import ImportGraph
+from DZ.git_metadata import GitHistory
+from DZ.doc_writers import MarkdownApiWriter, JsonStreamWriter, WRITE_BUFFER_SIZE, format_signature, group_by_package
+
+# Версия формата результатов разбора: при изменении извлечения кеш сбрасывается
+ANALYZER_VERSION = '1.6'
+
+# Ниже этого числа файлов пул процессов дороже последовательного разбора
+PARALLEL_MIN_FILES = 20
+
+# Служебные директории, которые не обходятся (а также все скрытые)
+IGNORED_DIRS = {'__pycache__', 'venv', 'env', '.env', 'node_modules', 'dist', 'build'}
+
+
+def iter_python_files(root: str) -> Iterator[os.DirEntry]:
+    """
+    .py файлы без служебных директорий в порядке os.walk. DirEntry сохраняет
+    результат stat(), поэтому опрос в режиме наблюдения обходится одним проходом
+    """
+    try:
+        with os.scandir(root) as iterator:
+            entries = list(iterator)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir():
+            # Как os.walk: ссылки на директории не обходятся
+            if not entry.name.startswith('.') and entry.name not in IGNORED_DIRS and not entry.is_symlink():
+                subdirs.append(entry.path)
+        elif entry.name.endswith('.py'):
+            yield entry
+    for path in subdirs:
+        yield from iter_python_files(path)
+
+
+class ModuleVisitor(ast.NodeVisitor):
+    """
+    Однопроходный обход модуля с учетом областей видимости.
+    Методы попадают только в свой класс, функции (в том числе вложенные) -
+    в список функций модуля; у всех есть qualname вида Class.method.inner.
+    """
+    
+    def __init__(self, module: ModuleRecord):
+        self.module = module
+        self.dependencies: Set[str] = set()
+        # Стек областей: (имя, запись класса или None для функции)
+        self._scopes: List[Tuple[str, Optional[ClassRecord]]] = []
+    
+    def _qualname(self, name: str) -> str:
+        return '.'.join([scope for scope, _ in self._scopes] + [name])
+    
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        class_record = ClassRecord(qualname=self._qualname(node.name), module=self.module.file_path,
+                                   **CodeDocumentationGenerator._extract_class_info(node))
+        self.module.classes.append(class_record)
+        
+        self._scopes.append((node.name, class_record))
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    def _visit_function(self, node) -> None:
+        func_record = FunctionRecord(qualname=self._qualname(node.name), module=self.module.file_path,
+                                     **CodeDocumentationGenerator._extract_function_info(node))
+        
+        parent_class = self._scopes[-1][1] if self._scopes else None
+        if parent_class is not None:
+            parent_class.methods.append(func_record)
+        else:
+            self.module.functions.append(func_record)
+        
+        self._scopes.append((node.name, None))
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+    
+    def _visit_import(self, node) -> None:
+        imports, dependencies, refs = CodeDocumentationGenerator._extract_import_info(node)
+        self.module.imports.extend(imports)
+        self.module.import_refs.extend(refs)
+        self.dependencies.update(dependencies)
+    
+    visit_Import = _visit_import
+    visit_ImportFrom = _visit_import
+
+
+def _add_time(timings: Optional[Dict[str, float]], phase: str, seconds: float) -> None:
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+def parse_module_file(file_path: str, project_path: str, source: Optional[bytes] = None,
+                      timings: Optional[Dict[str, float]] = None
+                      ) -> Tuple[Optional[ModuleRecord], List[str], Optional[str]]:
+    """
+    Чтение и разбор одного файла. Функция уровня модуля, чтобы ее можно было
+    выполнять в пуле процессов: возвращает (модуль, зависимости, ошибка),
+    все части пригодны для pickle. В timings накапливается время разбора
+    AST (parse) и извлечения записей (extract).
+    """
+    try:
+        if source is None:
+            with open(file_path, 'rb') as f:
+                source = f.read()
+        content = source.decode('utf-8')
+        
+        started = time.perf_counter()
+        tree = ast.parse(content)
+        parsed = time.perf_counter()
+        _add_time(timings, 'parse', parsed - started)
+        relative_path = os.path.relpath(file_path, project_path)
+        
+        module = ModuleRecord(relative_path, lines_of_code=len(content.splitlines()))
+        
+        # Анализ AST дерева за один проход
+        visitor = ModuleVisitor(module)
+        visitor.visit(tree)
+        _add_time(timings, 'extract', time.perf_counter() - parsed)
+        
+        return module, sorted(visitor.dependencies), None
+        
+    except SyntaxError as e:
+        return None, [], f"⚠️  Синтаксическая ошибка в файле {file_path}: {e}"
+    except Exception as e:
+        return None, [], f"❌ Ошибка при анализе файла {file_path}: {e}"
+
+
+def read_and_parse(file_path: str, project_path: str,
+                   timings: Optional[Dict[str, float]] = None) -> Tuple[str, str, Tuple]:
+    """Разбор файла с хешем содержимого для кеша: (путь, хеш, результат разбора)"""
+    try:
+        with open(file_path, 'rb') as f:
+            source = f.read()
+    except OSError as e:
+        return file_path, '', (None, [], f"❌ Ошибка при чтении файла {file_path}: {e}")
+    return file_path, content_hash(source), parse_module_file(file_path, project_path, source, timings)
+
+
+def _parse_module_chunk(file_paths: List[str], project_path: str,
+                        timed: bool = False) -> Tuple[List[Tuple], Optional[Dict[str, float]]]:
+    """Разбор пачки файлов в одном процессе, чтобы не платить за передачу каждого"""
+    timings = {} if timed else None
+    return [read_and_parse(file_path, project_path, timings) for file_path in file_paths], timings
 
 
 class CodeDocumentationGenerator:
     """Генератор документации для Python проектов"""
     
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, jobs: int = 1, cache_file: Optional[str] = None,
+                 git_cache_file: Optional[str] = None):
         self.project_path = os.path.abspath(project_path)
+        # Число процессов для разбора файлов; 0 - по числу ядер
+        self.jobs = jobs or os.cpu_count() or 1
+        # Кеш разбора: неизмененные файлы не перечитываются и не разбираются
+        self.cache = AnalysisCache(cache_file, self.project_path, ANALYZER_VERSION) if cache_file else None
+        # Модули, функции и классы; индексы по модулю и по полному имени
+        self.model = CodeModel()
+        # Граф импортов между модулями проекта, строится после обхода
+        self.graph = ImportGraph()
+        # История git по файлам: один проход git log, кеш по HEAD
+        self.git = GitHistory(self.project_path, git_cache_file)
         self.structure = {
             'project_info': {
                 'name': os.path.basename(self.project_path),
                 'analysis_date': datetime.now().isoformat(),
                 'total_files': 0
             },
-            'modules': [],
-            'functions': [],
-            'classes': [],
-            'imports': {},
-            'dependencies': set()
+            'dependencies': []
         }
+        # Внешние пакеты по модулям: при повторном разборе модуля его вклад заменяется
+        self.module_dependencies: Dict[str, List[str]] = {}
+        # Накопленное время обхода (walk), разбора (parse) и извлечения (extract), с;
+        # None - не замерять. При jobs > 1 parse и extract суммируются по процессам
+        self.timings: Optional[Dict[str, float]] = None
     
     def analyze_project(self) -> None:
         """Основной метод анализа проекта"""
@@ -30,87 +189,155 @@ class CodeDocumentationGenerator:
         self._extract_git_info()
         self._walk_directory()
         self._generate_dependencies()
+        self.graph = ImportGraph.from_model(self.model)
+        self._merge_git_history(self.model.modules.values())
         
-        self.structure['project_info']['total_files'] = len(self.structure['modules'])
-        print(f"✅ Проанализировано {len(self.structure['modules'])} файлов")
+        self.structure['project_info']['total_files'] = len(self.model)
+        print(f"✅ Проанализировано {len(self.model)} файлов")
+        if self.cache:
+            print(f"   Из кеша: {self.cache.hits}, разобрано заново: {self.cache.misses}")
     
     def _extract_git_info(self) -> None:
-        """Извлечение информации из git истории"""
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--oneline', '-10'],
-                capture_output=True, text=True, cwd=self.project_path,
-                timeout=30
-            )
-            if result.returncode == 0:
-                self.structure['git_history'] = [
-                    line for line in result.stdout.split('\n') if line.strip()
-                ]
-            else:
-                self.structure['git_history'] = []
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+        """Извлечение информации из git истории (последние коммиты и история файлов)"""
+        self.git.load()
+        if self.git.available:
+            self.structure['git_history'] = self.git.recent
+            source = 'из кеша' if self.git.from_cache else 'из git log'
+            print(f"   История git: {len(self.git.files)} файлов ({source})")
+        elif self.git.head is None:
             self.structure['git_history'] = ["Git история недоступна"]
+        else:
+            self.structure['git_history'] = []
+    
+    def _merge_git_history(self, modules: Iterable[ModuleRecord]) -> None:
+        """Добавление истории git в записи модулей"""
+        for module in modules:
+            module.history = self.git.get(module.file_path)
     
     def _walk_directory(self) -> None:
         """Рекурсивный обход директории проекта"""
-        for root, dirs, files in os.walk(self.project_path):
-            # Игнорируем служебные директории
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in [
-                '__pycache__', 'venv', 'env', '.env', 'node_modules', 'dist', 'build'
-            ]]
+        started = time.perf_counter()
+        file_paths = self._collect_python_files()
+        _add_time(self.timings, 'walk', time.perf_counter() - started)
+        
+        if self.jobs > 1 and len(file_paths) >= PARALLEL_MIN_FILES:
+            self._analyze_parallel(file_paths)
+        else:
+            for file_path in file_paths:
+                self._analyze_python_file(file_path)
+        
+        if self.cache:
+            self.cache.prune(file_paths)
+            self.cache.save()
+    
+    def _collect_python_files(self) -> List[str]:
+        """Список .py файлов проекта без служебных директорий; __init__.py - модуль пакета"""
+        return [entry.path for entry in iter_python_files(self.project_path)]
+    
+    def _analyze_parallel(self, file_paths: List[str]) -> None:
+        """Разбор измененных файлов в пуле процессов и слияние в порядке обхода"""
+        results = {}
+        pending = []
+        for file_path in file_paths:
+            cached = self.cache.lookup(file_path) if self.cache else None
+            if cached is not None:
+                results[file_path] = cached
+            else:
+                pending.append(file_path)
+        
+        if len(pending) >= PARALLEL_MIN_FILES:
+            # multiprocessing загружается только для параллельного разбора
+            from concurrent.futures import ProcessPoolExecutor
             
-            for file in files:
-                if file.endswith('.py') and file != '__init__.py':
-                    file_path = os.path.join(root, file)
-                    self._analyze_python_file(file_path)
+            # Несколько пачек на процесс выравнивают нагрузку при разном размере файлов
+            chunk_size = max(1, len(pending) // (self.jobs * 4))
+            chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+            
+            timed = self.timings is not None
+            parsed = []
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                for chunk_results, chunk_timings in executor.map(
+                    _parse_module_chunk, chunks, [self.project_path] * len(chunks), [timed] * len(chunks)
+                ):
+                    parsed.extend(chunk_results)
+                    for phase, seconds in (chunk_timings or {}).items():
+                        _add_time(self.timings, phase, seconds)
+        else:
+            parsed = [read_and_parse(file_path, self.project_path, self.timings) for file_path in pending]
+        
+        for file_path, file_hash, result in parsed:
+            results[file_path] = result
+            if self.cache and file_hash:
+                self.cache.store(file_path, file_hash, result)
+        
+        for file_path in file_paths:
+            self._merge_module(*results[file_path])
     
     def _analyze_python_file(self, file_path: str) -> None:
-        """Анализ отдельного Python файла"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            tree = ast.parse(content)
+        """Анализ отдельного Python файла (из кеша, если файл не менялся)"""
+        result = self.cache.lookup(file_path) if self.cache else None
+        if result is None:
+            _, file_hash, result = read_and_parse(file_path, self.project_path, self.timings)
+            if self.cache and file_hash:
+                self.cache.store(file_path, file_hash, result)
+        self._merge_module(*result)
+    
+    def _merge_module(self, module: Optional[ModuleRecord], dependencies: List[str],
+                      error: Optional[str]) -> None:
+        """Добавление результатов разбора модуля в модель"""
+        if error:
+            print(error)
+            return
+        
+        self.module_dependencies[module.file_path] = dependencies
+        self.model.add_module(module)
+    
+    def update_files(self, changed: Iterable[str], removed: Iterable[str]) -> Set[str]:
+        """
+        Повторный разбор измененных файлов и удаление исчезнувших без обхода
+        всего проекта. Возвращает относительные пути затронутых модулей.
+        Файл с синтаксической ошибкой сохраняет последнюю удачную версию.
+        """
+        touched = set()
+        modules_added_or_removed = False
+        
+        for file_path in removed:
             relative_path = os.path.relpath(file_path, self.project_path)
-            
-            module_info = {
-                'file_path': relative_path,
-                'functions': [],
-                'classes': [],
-                'imports': [],
-                'lines_of_code': len(content.splitlines())
-            }
-            
-            # Анализ AST дерева
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    func_info = self._extract_function_info(node)
-                    module_info['functions'].append(func_info)
-                    self.structure['functions'].append({
-                        **func_info,
-                        'module': relative_path
-                    })
-                
-                elif isinstance(node, ast.ClassDef):
-                    class_info = self._extract_class_info(node)
-                    module_info['classes'].append(class_info)
-                    self.structure['classes'].append({
-                        **class_info,
-                        'module': relative_path
-                    })
-                
-                elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                    import_info = self._extract_import_info(node)
-                    module_info['imports'].extend(import_info)
-            
-            self.structure['modules'].append(module_info)
-            
-        except SyntaxError as e:
-            print(f"⚠️  Синтаксическая ошибка в файле {file_path}: {e}")
-        except Exception as e:
-            print(f"❌ Ошибка при анализе файла {file_path}: {e}")
+            module = self.model.remove_module(relative_path)
+            self.module_dependencies.pop(relative_path, None)
+            if self.cache:
+                self.cache.forget(file_path)
+            if module is not None:
+                self.graph.remove_module(module.name)
+                touched.add(relative_path)
+                modules_added_or_removed = True
+        
+        for file_path in changed:
+            relative_path = os.path.relpath(file_path, self.project_path)
+            is_new = relative_path not in self.model.modules
+            self._analyze_python_file(file_path)
+            module = self.model.modules.get(relative_path)
+            if module is None:
+                continue
+            self._merge_git_history([module])
+            touched.add(relative_path)
+            if is_new:
+                self.graph.set_imports(module.name, ())
+                modules_added_or_removed = True
+            else:
+                self.graph.set_imports(module.name, self.graph.resolve_module(module))
+        
+        # Новый или удаленный модуль меняет разрешение импортов в других модулях
+        if modules_added_or_removed:
+            for module in self.model.modules.values():
+                self.graph.set_imports(module.name, self.graph.resolve_module(module))
+        
+        self._generate_dependencies()
+        self.structure['project_info']['total_files'] = len(self.model)
+        return touched
     
-    def _extract_function_info(self, node: ast.FunctionDef) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_function_info(node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> Dict[str, Any]:
         """Извлечение информации о функции"""
         args = []
         for arg in node.args.args:
@@ -139,16 +366,13 @@ class CodeDocumentationGenerator:
             'defaults_count': defaults,
             'docstring': docstring,
             'lineno': node.lineno,
-            'decorators': decorators
+            'decorators': decorators,
+            'is_async': isinstance(node, ast.AsyncFunctionDef)
         }
     
-    def _extract_class_info(self, node: ast.ClassDef) -> Dict[str, Any]:
-        """Извлечение информации о классе"""
-        methods = []
-        for item in node.body:
-            if isinstance(item, ast.FunctionDef):
-                methods.append(self._extract_function_info(item))
-        
+    @staticmethod
+    def _extract_class_info(node: ast.ClassDef) -> Dict[str, Any]:
+        """Извлечение информации о классе (методы добавляет ModuleVisitor)"""
         docstring = ast.get_docstring(node)
         
         # Обработка базовых классов
@@ -161,28 +385,37 @@ class CodeDocumentationGenerator:
         
         return {
             'name': node.name,
-            'methods': methods,
+            'methods': [],
             'docstring': docstring,
             'lineno': node.lineno,
             'bases': bases
         }
     
-    def _extract_import_info(self, node) -> List[str]:
-        """Извлечение информации об импортах"""
+    @staticmethod
+    def _extract_import_info(node) -> Tuple[List[str], Set[str], List[ImportRef]]:
+        """
+        Извлечение информации об импортах: строки импортов, пакеты верхнего уровня
+        и ссылки (уровень, модуль, имена) для построения графа импортов
+        """
         imports = []
+        dependencies = set()
+        refs = []
         if isinstance(node, ast.Import):
             for alias in node.names:
                 imports.append(alias.name)
-                self.structure['dependencies'].add(alias.name.split('.')[0])
+                dependencies.add(alias.name.split('.')[0])
+                refs.append((0, alias.name, ()))
         elif isinstance(node, ast.ImportFrom):
-            module = node.module
-            if module:
-                self.structure['dependencies'].add(module.split('.')[0])
-                for alias in node.names:
-                    full_name = f"{module}.{alias.name}" if module != '.' else alias.name
-                    imports.append(full_name)
+            module = node.module or ''
+            # Относительные импорты не внешние зависимости, но попадают в граф
+            if module and not node.level:
+                dependencies.add(module.split('.')[0])
+            prefix = '.' * node.level + module
+            for alias in node.names:
+                imports.append(f"{prefix}.{alias.name}" if module else f"{prefix}{alias.name}")
+            refs.append((node.level, module, tuple(alias.name for alias in node.names)))
         
-        return imports
+        return imports, dependencies, refs
     
     def _generate_dependencies(self) -> None:
         """Генерация списка зависимостей"""
@@ -191,14 +424,21 @@ class CodeDocumentationGenerator:
             'os', 'sys', 'json', 'datetime', 'typing', 'ast', 'subprocess', 
             'inspect', 'logging', 'argparse', 'asyncio', 'pathlib'
         }
-        self.structure['dependencies'] = list(self.structure['dependencies'] - stdlib)
+        dependencies = set()
+        for module_dependencies in self.module_dependencies.values():
+            dependencies.update(module_dependencies)
+        # Пакеты и модули верхнего уровня самого проекта - не внешние зависимости;
+        # сам каталог проекта тоже может импортироваться как пакет (from DZ import main)
+        local = {module.name.split('.')[0] for module in self.model.modules.values()}
+        local.add(os.path.basename(self.project_path))
+        self.structure['dependencies'] = sorted(dependencies - stdlib - local)
     
-    def generate_markdown_docs(self, output_dir: str) -> None:
+    def generate_markdown_docs(self, output_dir: str, shard_by_package: bool = False) -> None:
         """Генерация Markdown документации"""
         os.makedirs(output_dir, exist_ok=True)
         
         self._generate_readme(output_dir)
-        self._generate_api_reference(output_dir)
+        self._generate_api_reference(output_dir, shard_by_package)
         self._generate_changelog(output_dir)
         self._generate_requirements(output_dir)
         
@@ -207,7 +447,146 @@ class CodeDocumentationGenerator:
     def _generate_readme(self, output_dir: str) -> None:
         """Генерация README.md"""
         project_name = self.structure['project_info']['name']
+        counts = self.model.counts()
+        
+        with open(os.path.join(output_dir, 'README.md'), 'w', encoding='utf-8',
+                  buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(f"# {project_name.title()}\n\n"
+                    f"Документация сгенерирована автоматически: {self.structure['project_info']['analysis_date']}\n\n"
+                    f"## Статистика\n\n"
+                    f"- Модулей: {counts['modules']}\n"
+                    f"- Строк кода: {counts['lines_of_code']}\n"
+                    f"- Классов: {counts['classes']}\n"
+                    f"- Методов: {counts['methods']}\n"
+                    f"- Функций: {counts['functions']}\n\n"
+                    f"## Модули\n\n"
+                    f"| Модуль | Строк | Классов | Функций | Коммитов | Последнее изменение |\n"
+                    f"|---|---|---|---|---|---|\n")
+            for module in self.model.modules.values():
+                f.write(self._readme_row(module))
+            
+            if self.structure['dependencies']:
+                f.write("\n## Зависимости\n\n")
+                for name in sorted(self.structure['dependencies']):
+                    f.write(f"- {name}\n")
+            
+            f.write("\nПодробное описание API: [API_REFERENCE.md](API_REFERENCE.md)\n")
+    
+    @staticmethod
+    def _readme_row(module: ModuleRecord) -> str:
+        """Строка таблицы модулей README"""
+        history = module.history
+        last_change = f"{history.last_date[:10]}, {history.last_author}" if history else "-"
+        return (f"| `{module.file_path}` | {module.lines_of_code} | "
+                f"{len(module.classes)} | {len(module.functions)} | "
+                f"{history.commits if history else 0} | {last_change} |\n")
+    
+    def _generate_api_reference(self, output_dir: str, shard_by_package: bool = False,
+                                packages: Optional[Set[str]] = None) -> None:
+        """
+        Генерация API_REFERENCE.md (при шардировании - оглавление и файл на пакет в api/).
+        packages ограничивает перезапись шардов указанными пакетами.
+        """
+        if not shard_by_package:
+            with MarkdownApiWriter(os.path.join(output_dir, 'API_REFERENCE.md')) as writer:
+                for module in self.model.modules.values():
+                    writer.write_module(module)
+            return
+        
+        with MarkdownApiWriter(os.path.join(output_dir, 'API_REFERENCE.md')) as index:
+            for package, modules in group_by_package(self.model.modules.values()):
+                shard = os.path.join('api', f"{package}.md")
+                if packages is None or package in packages:
+                    with MarkdownApiWriter(os.path.join(output_dir, shard), title=package) as writer:
+                        for module in modules:
+                            writer.write_module(module)
+                documented = sum(1 for module in modules if module.classes or module.functions)
+                if documented:
+                    index.write_line(f"- [{package}]({shard.replace(os.sep, '/')}) - модулей: {documented}")
+    
+    def _generate_changelog(self, output_dir: str) -> None:
+        """Генерация CHANGELOG.md из git истории"""
+        lines = ["# Changelog", "", "## Последние изменения", ""]
+        lines += [f"- {entry}" for entry in self.structure.get('git_history', [])]
+        lines.append("")
+        
+        with open(os.path.join(output_dir, 'CHANGELOG.md'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+    
+    def _generate_requirements(self, output_dir: str) -> None:
+        """Генерация requirements.txt из внешних зависимостей"""
+        with open(os.path.join(output_dir, 'requirements.txt'), 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{name}\n" for name in sorted(self.structure['dependencies'])))
+    
+    def generate_json_structure(self, output_dir: str, shard_by_package: bool = False,
+                                packages: Optional[Set[str]] = None) -> None:
+        """
+        Генерация JSON со структурой проекта потоковой записью по модулям.
+        При шардировании модули пакета пишутся в json/<пакет>.json,
+        а project_structure.json содержит список шардов; packages ограничивает
+        перезапись шардов указанными пакетами.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        
+        header = {
+            'project_info': self.structure['project_info'],
+            'statistics': self.model.counts(),
+            'git_history': self.structure.get('git_history', []),
+            'dependencies': sorted(self.structure['dependencies'])
+        }
+        
+        json_path = os.path.join(output_dir, 'project_structure.json')
+        if not shard_by_package:
+            with JsonStreamWriter(json_path, header) as writer:
+                for module in self.model.modules.values():
+                    writer.write_module(module)
+        else:
+            with JsonStreamWriter(json_path, header, array_key='shards') as index:
+                for package, modules in group_by_package(self.model.modules.values()):
+                    shard = os.path.join('json', f"{package}.json")
+                    if packages is None or package in packages:
+                        with JsonStreamWriter(os.path.join(output_dir, shard), {'package': package}) as writer:
+                            for module in modules:
+                                writer.write_module(module)
+                    index.write_item({'package': package, 'path': shard.replace(os.sep, '/'),
+                                      'modules': len(modules)})
+        
+        print(f"📊 JSON структура сохранена в {json_path}")
+    
+    @staticmethod
+    def _uml_alias(record: ClassRecord) -> str:
+        return f"{module_name_from_path(record.module)}.{record.qualname}".replace('.', '_')
+    
+    def generate_uml_diagram(self, output_dir: str) -> None:
+        """Генерация диаграммы классов в формате PlantUML (потоковая запись)"""
+        os.makedirs(output_dir, exist_ok=True)
         
-        total_lines = sum(m.get('lines_of_code', 0) for m in self.structure['modules'])
+        aliases = {}
+        for class_record in self.model.classes():
+            aliases.setdefault(class_record.name, self._uml_alias(class_record))
         
-        readme_content = f"{project_name.title()}"
\ No newline at end of file
+        uml_path = os.path.join(output_dir, 'class_diagram.puml')
+        with open(uml_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write("@startuml\n\n")
+            for class_record in self.model.classes():
+                f.write(f'class "{class_record.qualname}" as {self._uml_alias(class_record)} {{\n')
+                for method in class_record.methods:
+                    f.write(f"  +{format_signature(method)}\n")
+                f.write("}\n")
+            
+            f.write("\n")
+            for class_record in self.model.classes():
+                for base in class_record.bases:
+                    if base in aliases:
+                        f.write(f"{aliases[base]} <|-- {self._uml_alias(class_record)}\n")
+            
+            f.write("\n@enduml\n")
+        
+        print(f"📐 UML диаграмма сохранена в {uml_path}")
+    
+    def generate_import_graph(self, output_dir: str, graph_format: str = 'dot', depth: int = 0) -> str:
+        """Запись графа импортов; depth > 0 сворачивает модули до пакетов"""
+        graph_path = os.path.join(output_dir, f"import_graph.{graph_format}")
+        self.graph.write(graph_path, graph_format, depth)
+        print(f"🕸️  Граф импортов сохранен в {graph_path}")
+        return graph_path
@@ -0,0 +1,206 @@
+"""
+Компактная модель результатов анализа кода: записи со __slots__ и индексы
+"""
+
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# Ссылка импорта: (уровень относительного импорта, модуль, импортируемые имена)
+ImportRef = Tuple[int, str, Tuple[str, ...]]
+
+
+def module_name_from_path(file_path: str) -> str:
+    """Имя модуля по относительному пути: DZ/main.py -> DZ.main, DZ/__init__.py -> DZ"""
+    name = file_path[:-3] if file_path.endswith('.py') else file_path
+    name = name.replace('\\', '/').replace('/', '.')
+    return name[:-len('.__init__')] if name.endswith('.__init__') else name
+
+
+def is_package_path(file_path: str) -> bool:
+    return file_path.replace('\\', '/').rpartition('/')[2] == '__init__.py'
+
+
+def package_from_path(file_path: str) -> str:
+    """Пакет по директории файла: DZ/main.py и DZ/__init__.py -> DZ, файлы в корне - ''"""
+    return file_path.replace('\\', '/').rpartition('/')[0].replace('/', '.')
+
+
+class FunctionRecord:
+    """Функция или метод"""
+
+    __slots__ = ('name', 'qualname', 'module', 'args', 'defaults_count',
+                 'docstring', 'lineno', 'decorators', 'is_async')
+
+    def __init__(self, name: str, qualname: str, module: str, args: List[str],
+                 defaults_count: int, docstring: Optional[str], lineno: int,
+                 decorators: List[str], is_async: bool = False):
+        self.name = name
+        self.qualname = qualname
+        self.module = module
+        self.args = tuple(args)
+        self.defaults_count = defaults_count
+        self.docstring = docstring
+        self.lineno = lineno
+        self.decorators = tuple(decorators)
+        self.is_async = is_async
+
+    def intern(self) -> None:
+        self.name = sys.intern(self.name)
+        self.qualname = sys.intern(self.qualname)
+        self.module = sys.intern(self.module)
+        self.args = tuple(sys.intern(arg) for arg in self.args)
+        self.decorators = tuple(sys.intern(decorator) for decorator in self.decorators)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'qualname': self.qualname,
+            'args': list(self.args),
+            'defaults_count': self.defaults_count,
+            'docstring': self.docstring,
+            'lineno': self.lineno,
+            'decorators': list(self.decorators),
+            'is_async': self.is_async
+        }
+
+
+class ClassRecord:
+    """Класс с методами"""
+
+    __slots__ = ('name', 'qualname', 'module', 'bases', 'docstring', 'lineno', 'methods')
+
+    def __init__(self, name: str, qualname: str, module: str, bases: List[str],
+                 docstring: Optional[str], lineno: int, methods: Optional[List[FunctionRecord]] = None):
+        self.name = name
+        self.qualname = qualname
+        self.module = module
+        self.bases = tuple(bases)
+        self.docstring = docstring
+        self.lineno = lineno
+        self.methods = methods if methods is not None else []
+
+    def intern(self) -> None:
+        self.name = sys.intern(self.name)
+        self.qualname = sys.intern(self.qualname)
+        self.module = sys.intern(self.module)
+        self.bases = tuple(sys.intern(base) for base in self.bases)
+        for method in self.methods:
+            method.intern()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'qualname': self.qualname,
+            'bases': list(self.bases),
+            'docstring': self.docstring,
+            'lineno': self.lineno,
+            'methods': [method.to_dict() for method in self.methods]
+        }
+
+
+class ModuleRecord:
+    """Модуль: функции (включая вложенные), классы и импорты"""
+
+    __slots__ = ('file_path', 'name', 'functions', 'classes', 'imports', 'import_refs', 'lines_of_code',
+                 'history')
+
+    def __init__(self, file_path: str, lines_of_code: int = 0):
+        self.file_path = file_path
+        self.name = module_name_from_path(file_path)
+        self.functions: List[FunctionRecord] = []
+        self.classes: List[ClassRecord] = []
+        self.imports: List[str] = []
+        self.import_refs: List[ImportRef] = []
+        self.lines_of_code = lines_of_code
+        # История git (FileHistory), добавляется генератором после анализа
+        self.history = None
+
+    @property
+    def is_package(self) -> bool:
+        """Модуль - __init__.py пакета: относительные импорты отсчитываются от него самого"""
+        return is_package_path(self.file_path)
+
+    def intern(self) -> None:
+        self.file_path = sys.intern(self.file_path)
+        self.name = sys.intern(self.name)
+        self.imports = [sys.intern(name) for name in self.imports]
+        self.import_refs = [(level, sys.intern(module), tuple(sys.intern(name) for name in names))
+                            for level, module, names in self.import_refs]
+        for record in self.functions:
+            record.intern()
+        for record in self.classes:
+            record.intern()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'file_path': self.file_path,
+            'name': self.name,
+            'functions': [record.to_dict() for record in self.functions],
+            'classes': [record.to_dict() for record in self.classes],
+            'imports': list(self.imports),
+            'lines_of_code': self.lines_of_code,
+            'history': self.history.to_dict() if self.history is not None else None
+        }
+
+
+Symbol = Union[FunctionRecord, ClassRecord]
+
+
+class CodeModel:
+    """
+    Результаты анализа в одном экземпляре на объект: модули в порядке обхода
+    и индекс символов по полному имени (module.Class.method). Плоские списки
+    функций и классов не хранятся, их дают итераторы; словари для JSON
+    строятся только при выводе.
+    """
+
+    def __init__(self):
+        self.modules: Dict[str, ModuleRecord] = {}
+        self.by_qualname: Dict[str, Symbol] = {}
+
+    def __len__(self) -> int:
+        return len(self.modules)
+
+    def add_module(self, module: ModuleRecord) -> None:
+        """Добавление модуля (повторное добавление по тому же пути заменяет прежний)"""
+        self.remove_module(module.file_path)
+        module.intern()
+        self.modules[module.file_path] = module
+        for record in self._symbols(module):
+            self.by_qualname[f"{module.name}.{record.qualname}"] = record
+
+    def remove_module(self, file_path: str) -> Optional[ModuleRecord]:
+        module = self.modules.pop(file_path, None)
+        if module is not None:
+            for record in self._symbols(module):
+                self.by_qualname.pop(f"{module.name}.{record.qualname}", None)
+        return module
+
+    @staticmethod
+    def _symbols(module: ModuleRecord) -> Iterator[Symbol]:
+        yield from module.functions
+        for class_record in module.classes:
+            yield class_record
+            yield from class_record.methods
+
+    def get(self, qualified_name: str) -> Optional[Symbol]:
+        """Символ по полному имени, например DZ.main.run_crawl"""
+        return self.by_qualname.get(qualified_name)
+
+    def functions(self) -> Iterator[FunctionRecord]:
+        for module in self.modules.values():
+            yield from module.functions
+
+    def classes(self) -> Iterator[ClassRecord]:
+        for module in self.modules.values():
+            yield from module.classes
+
+    def counts(self) -> Dict[str, int]:
+        modules = self.modules.values()
+        return {
+            'modules': len(self.modules),
+            'functions': sum(len(module.functions) for module in modules),
+            'classes': sum(len(module.classes) for module in modules),
+            'methods': sum(len(record.methods) for record in self.classes()),
+            'lines_of_code': sum(module.lines_of_code for module in modules)
+        }
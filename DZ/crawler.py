@@ -0,0 +1,215 @@
+"""
+Параллельный обход списка URL с ограничением конкурентности и частоты запросов
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from DZ.browser_pool import BrowserPool
+from DZ.habr_automation import HabrAutomation
+from DZ.resource_filter import ResourceFilter
+from DZ.navigation import AdaptiveNavigator
+from DZ.http_extractor import HttpArticleExtractor
+from DZ.http_cache import CacheRouter
+from DZ.article_sink import JsonlArticleSink
+from DZ.metrics import MetricsRegistry
+
+
+def load_urls(urls: Optional[List[str]] = None, urls_file: Optional[str] = None,
+              page_template: Optional[str] = None, pages: Optional[str] = None) -> List[str]:
+    """
+    Сбор списка URL из аргументов, файла (по одному на строку, # - комментарий)
+    и шаблона пагинации вида https://habr.com/ru/articles/page{N}/ с диапазоном "1-50"
+    """
+    result = list(urls or [])
+
+    if urls_file:
+        with open(urls_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    result.append(line)
+
+    if page_template and pages:
+        start, _, end = pages.partition('-')
+        for number in range(int(start), int(end or start) + 1):
+            result.append(page_template.replace('{N}', str(number)))
+
+    # Убираем дубликаты, сохраняя порядок
+    return list(dict.fromkeys(result))
+
+
+class HostRateLimiter:
+    """Ограничение частоты запросов к каждому хосту (минимальный интервал между стартами)"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HabrCrawler:
+    """
+    Обход множества страниц через общий пул браузеров.
+    Очередь ограниченного размера дает обратное давление на источник URL,
+    число воркеров ограничивает число одновременно открытых страниц.
+    """
+
+    def __init__(self, pool: BrowserPool, concurrency: int = 4,
+                 requests_per_second: float = 2.0, queue_size: Optional[int] = None,
+                 keywords: Optional[List[str]] = None,
+                 resource_filter: Optional[ResourceFilter] = None,
+                 http_extractor: Optional[HttpArticleExtractor] = None,
+                 cache_router: Optional[CacheRouter] = None,
+                 sink: Optional[JsonlArticleSink] = None,
+                 metrics: Optional[MetricsRegistry] = None,
+                 navigator: Optional[AdaptiveNavigator] = None):
+        self.pool = pool
+        self.resource_filter = resource_filter
+        self.navigator = navigator or AdaptiveNavigator()
+        self.http_extractor = http_extractor
+        self.cache_router = cache_router
+        # При потоковой записи статьи не копятся в памяти, фильтрует сам sink
+        self.sink = sink
+        self.metrics = metrics or MetricsRegistry()
+        self.concurrency = concurrency
+        self.rate_limiter = HostRateLimiter(requests_per_second)
+        self.queue_size = queue_size or concurrency * 2
+        self.keywords = keywords
+        self.logger = logging.getLogger(__name__)
+
+        self.pages_ok = 0
+        self.pages_failed = 0
+        self.pages_http = 0
+        self.failed_urls: List[str] = []
+        self.articles: List[Dict] = []
+        self.elapsed = 0.0
+
+    async def crawl(self, urls: List[str]) -> Dict:
+        """Обход всех URL и сбор статей в общий результат"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        started = time.monotonic()
+
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+
+        # put() блокируется, пока воркеры не разберут очередь
+        for url in urls:
+            await queue.put(url)
+        for _ in workers:
+            await queue.put(None)
+
+        await asyncio.gather(*workers)
+        self.elapsed = time.monotonic() - started
+        self.navigator.save()
+
+        self.logger.info(
+            f"Обход завершен: {self.pages_ok} успешно, {self.pages_failed} с ошибкой, "
+            f"{self.pages_per_minute:.1f} стр/мин"
+        )
+
+        return {
+            'source_urls': urls,
+            'keywords': self.keywords or [],
+            'total_found': len(self.articles),
+            'articles': self.articles,
+            'crawl_stats': self.stats()
+        }
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            url = await queue.get()
+            try:
+                if url is None:
+                    return
+                await self.rate_limiter.wait(url)
+                await self._process(url)
+            except Exception as e:
+                # Воркер не должен завершаться: иначе put() в crawl() ждет вечно
+                self._record_failure(url, e)
+            finally:
+                queue.task_done()
+
+    async def _process(self, url: str) -> None:
+        """Загрузка одной страницы и извлечение статей"""
+        keywords = None if self.sink else self.keywords
+        started = time.monotonic()
+
+        if self.http_extractor:
+            try:
+                with self.metrics.timer('extraction', backend='http'):
+                    data = await self.http_extractor.extract_articles_data(url, keywords)
+                if data is not None:
+                    self.metrics.inc('pages', status='ok', backend='http')
+                    await self._collect(data['articles'])
+                    self.pages_ok += 1
+                    self.pages_http += 1
+                    self._log_page(url, 'http', started)
+                    return
+            except Exception as e:
+                self._record_failure(url, e)
+                return
+            self.metrics.inc('retries', reason='browser_fallback')
+
+        automation = HabrAutomation(pool=self.pool, resource_filter=self.resource_filter,
+                                    navigator=self.navigator, cache_router=self.cache_router,
+                                    metrics=self.metrics)
+        try:
+            await automation.setup_browser()
+            await automation.navigate_to_site(url, fallback=False)
+            data = await automation.extract_articles_data(keywords)
+            await self._collect(data['articles'])
+            self.pages_ok += 1
+            self._log_page(url, 'browser', started)
+        except Exception as e:
+            self._record_failure(url, e)
+        finally:
+            await automation.close()
+
+    def _record_failure(self, url: str, error: BaseException) -> None:
+        self.logger.error(f"Ошибка при обходе {url}: {error}")
+        self.pages_failed += 1
+        self.failed_urls.append(url)
+
+    def _log_page(self, url: str, phase: str, started: float) -> None:
+        elapsed = time.monotonic() - started
+        elapsed_ms = round(elapsed * 1000, 1)
+        self.metrics.observe_phase('page_total', elapsed, backend=phase)
+        self.logger.info(f"Страница обработана ({phase}, {elapsed_ms} мс): {url}",
+                         extra={'url': url, 'phase': phase, 'elapsed_ms': elapsed_ms})
+
+    async def _collect(self, articles: List[Dict]) -> None:
+        if self.sink:
+            await self.sink.add_many(articles)
+        else:
+            self.articles.extend(articles)
+
+    @property
+    def pages_per_minute(self) -> float:
+        total = self.pages_ok + self.pages_failed
+        return total / self.elapsed * 60 if self.elapsed else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            'pages_ok': self.pages_ok,
+            'pages_failed': self.pages_failed,
+            'pages_http': self.pages_http,
+            'failed_urls': self.failed_urls,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'pages_per_minute': round(self.pages_per_minute, 2)
+        }
@@ -0,0 +1,165 @@
+"""
+Режим наблюдения: перегенерация документации при изменении файлов проекта
+"""
+
+import os
+import time
+from typing import Dict, Optional, Set, Tuple
+from DZ.code_analyzer import CodeDocumentationGenerator, iter_python_files
+from DZ.code_model import ModuleRecord, module_name_from_path, package_from_path
+from DZ.doc_writers import ROOT_PACKAGE, format_signature
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def _package_of_path(relative_path: str) -> str:
+    return package_from_path(relative_path) or ROOT_PACKAGE
+
+
+def _class_signature(module: ModuleRecord) -> Tuple:
+    """То, что модуль вносит в диаграмму классов"""
+    return tuple((record.qualname, tuple(record.bases), tuple(format_signature(method) for method in record.methods))
+                 for record in module.classes)
+
+
+class DocWatcher:
+    """
+    Опрос файлов проекта по (размер, mtime) с подавлением дребезга: серия
+    сохранений обрабатывается одним обновлением, когда файлы перестают
+    меняться на debounce секунд. Разбираются только измененные модули,
+    перезаписываются только зависящие от них файлы документации: шарды
+    затронутых пакетов и оглавления (поэтому по умолчанию документация
+    шардируется), README и диаграмма классов - только если изменилось
+    их содержимое.
+    """
+
+    def __init__(self, generator: CodeDocumentationGenerator, output_dir: str,
+                 shard_by_package: bool = True, interval: float = 1.0, debounce: float = 0.3,
+                 graph_format: Optional[str] = None):
+        self.generator = generator
+        self.output_dir = output_dir
+        self.shard_by_package = shard_by_package
+        self.interval = interval
+        self.debounce = debounce
+        self.graph_format = graph_format
+        self.updates = 0
+        self._snapshot: Snapshot = self._scan()
+
+    def _scan(self) -> Snapshot:
+        snapshot = {}
+        for entry in iter_python_files(self.generator.project_path):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    @staticmethod
+    def _diff(old: Snapshot, new: Snapshot) -> Tuple[Set[str], Set[str]]:
+        changed = {path for path, stat in new.items() if old.get(path) != stat}
+        removed = set(old) - set(new)
+        return changed, removed
+
+    def poll(self) -> Tuple[Set[str], Set[str]]:
+        """Изменения с прошлого опроса, дождавшись окончания серии записей"""
+        snapshot = self._scan()
+        changed, removed = self._diff(self._snapshot, snapshot)
+        if not changed and not removed:
+            return changed, removed
+
+        # Редактор может сохранять файл в несколько приемов: ждем тишины
+        while True:
+            time.sleep(self.debounce)
+            latest = self._scan()
+            if latest == snapshot:
+                break
+            snapshot = latest
+
+        changed, removed = self._diff(self._snapshot, snapshot)
+        self._snapshot = snapshot
+        return changed, removed
+
+    def apply(self, changed: Set[str], removed: Set[str]) -> Set[str]:
+        """Обновление модели и перезапись затронутых файлов документации"""
+        started = time.monotonic()
+        generator = self.generator
+        model = generator.model
+
+        old_dependencies = list(generator.structure['dependencies'])
+        old_counts = model.counts()
+        old_edges = {}
+        old_rows = {}
+        old_classes = {}
+        for file_path in changed | removed:
+            relative_path = os.path.relpath(file_path, generator.project_path)
+            module = model.modules.get(relative_path)
+            if module is not None:
+                old_edges[module.name] = generator.graph.dependencies(module.name)
+                old_rows[relative_path] = generator._readme_row(module)
+                old_classes[relative_path] = _class_signature(module)
+
+        touched = generator.update_files(sorted(changed), sorted(removed))
+        if not touched:
+            return touched
+
+        packages = {_package_of_path(relative_path) for relative_path in touched}
+        new_rows = {path: generator._readme_row(model.modules[path]) for path in touched if path in model.modules}
+        new_classes = {path: _class_signature(model.modules[path]) for path in touched if path in model.modules}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        # README - сводка по всем модулям: переписывается, только если она изменилась
+        if (new_rows != old_rows or model.counts() != old_counts
+                or generator.structure['dependencies'] != old_dependencies):
+            generator._generate_readme(self.output_dir)
+        generator._generate_api_reference(self.output_dir, self.shard_by_package, packages)
+        generator.generate_json_structure(self.output_dir, self.shard_by_package, packages)
+        if self.shard_by_package:
+            self._remove_empty_shards(packages)
+        if generator.structure['dependencies'] != old_dependencies:
+            generator._generate_requirements(self.output_dir)
+        if {path: value for path, value in old_classes.items() if value} != \
+                {path: value for path, value in new_classes.items() if value}:
+            generator.generate_uml_diagram(self.output_dir)
+        if self.graph_format and (removed or self._edges_changed(old_edges, touched)):
+            generator.generate_import_graph(self.output_dir, self.graph_format)
+
+        self.updates += 1
+        elapsed_ms = (time.monotonic() - started) * 1000
+        print(f"♻️  Обновлено модулей: {len(touched)} (пакеты: {', '.join(sorted(packages))}) "
+              f"за {elapsed_ms:.0f} мс")
+        return touched
+
+    def _edges_changed(self, old_edges: Dict[str, Set[str]], touched: Set[str]) -> bool:
+        names = {module_name_from_path(relative_path) for relative_path in touched}
+        # Новый модуль мог изменить разрешение импортов в других модулях
+        if set(old_edges) != names:
+            return True
+        return any(self.generator.graph.dependencies(name) != old_edges[name] for name in names)
+
+    def _remove_empty_shards(self, packages: Set[str]) -> None:
+        """Шарды пакетов, в которых не осталось модулей"""
+        alive = {_package_of_path(relative_path) for relative_path in self.generator.model.modules}
+        for package in packages - alive:
+            for shard in (os.path.join('api', f"{package}.md"), os.path.join('json', f"{package}.json")):
+                path = os.path.join(self.output_dir, shard)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def run(self) -> None:
+        """Цикл наблюдения до Ctrl+C; кеш разбора сохраняется при выходе"""
+        print(f"👀 Наблюдение за {self.generator.project_path} (опрос каждые {self.interval} с, Ctrl+C - выход)")
+        if not self.shard_by_package:
+            print("   Без шардирования каждое изменение переписывает весь API reference и JSON")
+        try:
+            while True:
+                changed, removed = self.poll()
+                if changed or removed:
+                    self.apply(changed, removed)
+                else:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print(f"\n👋 Наблюдение остановлено, обновлений: {self.updates}")
+        finally:
+            if self.generator.cache:
+                self.generator.cache.save()
@@ -0,0 +1,131 @@
+"""
+Потоковая запись документации: API reference и JSON структура по одному модулю
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from DZ.code_model import FunctionRecord, ModuleRecord, package_from_path
+
+# Размер буфера файлов документации
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Имя шарда для модулей в корне проекта
+ROOT_PACKAGE = '__root__'
+
+
+def format_signature(record: FunctionRecord, qualified: bool = False) -> str:
+    prefix = 'async ' if record.is_async else ''
+    name = record.qualname if qualified else record.name
+    return f"{prefix}{name}({', '.join(record.args)})"
+
+
+def package_of(module: ModuleRecord) -> str:
+    """Пакет модуля: DZ.main и DZ (__init__.py) -> DZ, модули в корне - __root__"""
+    return package_from_path(module.file_path) or ROOT_PACKAGE
+
+
+def group_by_package(modules: Iterable[ModuleRecord]) -> Iterator[Tuple[str, List[ModuleRecord]]]:
+    """Модули, сгруппированные по пакетам, пакеты по алфавиту"""
+    groups: Dict[str, List[ModuleRecord]] = {}
+    for module in modules:
+        groups.setdefault(package_of(module), []).append(module)
+    for package in sorted(groups):
+        yield package, groups[package]
+
+
+def _open(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+
+class MarkdownApiWriter:
+    """Markdown API reference: каждый модуль записывается сразу после форматирования"""
+
+    def __init__(self, path: str, title: str = 'API Reference'):
+        self.path = path
+        self.modules = 0
+        self._file = _open(path)
+        self._file.write(f"# {title}\n\n")
+
+    def write_module(self, module: ModuleRecord) -> None:
+        if not module.classes and not module.functions:
+            return
+        write = self._file.write
+        write(f"## {module.name}\n\nФайл: `{module.file_path}`\n\n")
+        history = module.history
+        if history is not None:
+            write(f"Последнее изменение: {history.last_date[:10]}, {history.last_author} "
+                  f"({history.last_commit}); коммитов: {history.commits}, "
+                  f"строк +{history.lines_added}/-{history.lines_deleted}, авторов: {len(history.authors)}\n\n")
+
+        for class_record in module.classes:
+            bases = f"({', '.join(class_record.bases)})" if class_record.bases else ""
+            write(f"### class {class_record.qualname}{bases}\n\n")
+            self._write_docstring(class_record.docstring)
+            for method in class_record.methods:
+                write(f"#### `{format_signature(method)}`\n\n")
+                self._write_docstring(method.docstring)
+
+        for func_record in module.functions:
+            write(f"### `{format_signature(func_record, qualified=True)}`\n\n")
+            self._write_docstring(func_record.docstring)
+        self.modules += 1
+
+    def _write_docstring(self, docstring: Optional[str]) -> None:
+        if docstring:
+            self._file.write(f"{docstring}\n\n")
+
+    def write_line(self, line: str = '') -> None:
+        self._file.write(f"{line}\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonStreamWriter:
+    """
+    Потоковый JSON-объект: поля заголовка пишутся сразу, затем массив модулей
+    по одному элементу. В памяти одновременно только словарь одного модуля,
+    а не все дерево, как при json.dump.
+    """
+
+    def __init__(self, path: str, header: Dict[str, Any], array_key: str = 'modules'):
+        self.path = path
+        self.count = 0
+        self._encoder = json.JSONEncoder(ensure_ascii=False)
+        self._file = _open(path)
+        self._file.write('{\n')
+        for key, value in header.items():
+            self._file.write(f"  {self._encode(key)}: {self._encode(value)},\n")
+        self._file.write(f"  {self._encode(array_key)}: [")
+
+    def _encode(self, value: Any) -> str:
+        return self._encoder.encode(value)
+
+    def write_item(self, item: Dict[str, Any]) -> None:
+        # encode() одного элемента идет через C-кодировщик, iterencode() - через Python
+        self._file.write(',\n    ' if self.count else '\n    ')
+        self._file.write(self._encoder.encode(item))
+        self.count += 1
+
+    def write_module(self, module: ModuleRecord) -> None:
+        self.write_item(module.to_dict())
+
+    def close(self) -> None:
+        self._file.write('\n  ]\n}\n' if self.count else ']\n}\n')
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,209 @@
+"""
+История git по файлам за один проход git log с кешем по коммиту HEAD
+"""
+
+import json
+import os
+import subprocess
+from typing import Dict, Iterator, IO, List, Optional
+
+# Разделители полей заголовка коммита в выводе git log
+COMMIT_MARK = '\x1e'
+FIELD_SEP = '\x1f'
+LOG_FORMAT = f"--format={COMMIT_MARK}%h{FIELD_SEP}%an{FIELD_SEP}%aI{FIELD_SEP}%s"
+
+# Размер блока чтения потока git log, символов
+READ_CHUNK = 64 * 1024
+
+# Сколько последних коммитов показывать в истории проекта
+RECENT_COMMITS = 10
+
+# 2: пути читаются из git log -z без экранирования
+GIT_CACHE_VERSION = 2
+
+
+class FileHistory:
+    """Сводка по одному файлу: последний коммит, число коммитов и изменившихся строк"""
+
+    __slots__ = ('last_commit', 'last_author', 'last_date', 'commits', 'lines_added',
+                 'lines_deleted', 'authors')
+
+    def __init__(self, last_commit: str = '', last_author: str = '', last_date: str = '',
+                 commits: int = 0, lines_added: int = 0, lines_deleted: int = 0,
+                 authors: Optional[List[str]] = None):
+        self.last_commit = last_commit
+        self.last_author = last_author
+        self.last_date = last_date
+        self.commits = commits
+        self.lines_added = lines_added
+        self.lines_deleted = lines_deleted
+        self.authors = set(authors or ())
+
+    @property
+    def churn(self) -> int:
+        return self.lines_added + self.lines_deleted
+
+    def merge_older(self, older: 'FileHistory') -> None:
+        """Добавление истории из более ранних коммитов (последний коммит остается текущим)"""
+        self.commits += older.commits
+        self.lines_added += older.lines_added
+        self.lines_deleted += older.lines_deleted
+        self.authors.update(older.authors)
+
+    def to_dict(self) -> Dict:
+        return {
+            'last_commit': self.last_commit,
+            'last_author': self.last_author,
+            'last_date': self.last_date,
+            'commits': self.commits,
+            'lines_added': self.lines_added,
+            'lines_deleted': self.lines_deleted,
+            'authors': sorted(self.authors)
+        }
+
+
+def _nul_records(stream: IO[str]) -> Iterator[str]:
+    """Записи вывода git log -z: пути идут без кавычек и экранирования"""
+    tail = ''
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        records = (tail + chunk).split('\0')
+        tail = records.pop()
+        yield from records
+    if tail:
+        yield tail
+
+
+class GitHistory:
+    """
+    История файлов проекта, собранная одним потоковым вызовом
+    git log --numstat вместо процесса на каждый файл. Результат хранится
+    в JSON-кеше с привязкой к HEAD: при том же HEAD git log не запускается,
+    при новых коммитах поверх кешированного читаются только они.
+    """
+
+    def __init__(self, project_path: str, cache_file: Optional[str] = None):
+        self.project_path = project_path
+        self.cache_file = cache_file
+        self.head: Optional[str] = None
+        self.files: Dict[str, FileHistory] = {}
+        self.recent: List[str] = []
+        self.available = False
+        self.from_cache = False
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], capture_output=True, text=True,
+                              cwd=self.project_path, timeout=30)
+
+    def load(self) -> 'GitHistory':
+        try:
+            result = self._git('rev-parse', 'HEAD')
+            if result.returncode != 0:
+                return self
+            self.head = result.stdout.strip()
+
+            cached = self._load_cache()
+            if cached and cached['head'] == self.head:
+                self._restore(cached)
+                self.from_cache = True
+            elif cached and self._git('merge-base', '--is-ancestor', cached['head'], self.head).returncode == 0:
+                # Кеш от предка HEAD: дочитываем только новые коммиты
+                self._read_log(f"{cached['head']}..{self.head}")
+                self._merge_cached(cached)
+            else:
+                self._read_log(self.head)
+            self.available = True
+        except (subprocess.SubprocessError, FileNotFoundError, OSError):
+            self.available = False
+            return self
+
+        self._save_cache()
+        return self
+
+    def _read_log(self, revision_range: str) -> None:
+        """
+        Разбор потока git log по записям, без загрузки всего вывода в память.
+        С -z пути с не-ASCII символами, кавычками и пробелами приходят как есть,
+        а не в кавычках с восьмеричными escape-последовательностями.
+        """
+        process = subprocess.Popen(
+            ['git', 'log', '--numstat', '--no-renames', '--relative', '-z', LOG_FORMAT, revision_range, '--'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, cwd=self.project_path,
+            text=True, encoding='utf-8', errors='replace'
+        )
+        commit, author, date = '', '', ''
+        try:
+            for line in _nul_records(process.stdout):
+                # После заголовка коммита numstat начинается с перевода строки
+                line = line.lstrip('\n')
+                if line.startswith(COMMIT_MARK):
+                    commit, author, date, subject = line[1:].split(FIELD_SEP, 3)
+                    if len(self.recent) < RECENT_COMMITS:
+                        self.recent.append(f"{commit} {subject}")
+                    continue
+                if not line:
+                    continue
+
+                added, deleted, path = line.split('\t', 2)
+                history = self.files.get(path)
+                if history is None:
+                    # Лог идет от новых коммитов к старым: первое появление - последнее изменение
+                    history = self.files[path] = FileHistory(commit, author, date)
+                history.commits += 1
+                history.authors.add(author)
+                # Для бинарных файлов git пишет "-" вместо числа строк
+                if added != '-':
+                    history.lines_added += int(added)
+                    history.lines_deleted += int(deleted)
+        finally:
+            process.stdout.close()
+            if process.wait() != 0:
+                raise subprocess.SubprocessError('git log завершился с ошибкой')
+
+    def get(self, relative_path: str) -> Optional[FileHistory]:
+        return self.files.get(relative_path.replace(os.sep, '/'))
+
+    def _load_cache(self) -> Optional[Dict]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != GIT_CACHE_VERSION or data.get('project_path') != self.project_path:
+            return None
+        return data
+
+    def _restore(self, cached: Dict) -> None:
+        self.files = {path: FileHistory(**history) for path, history in cached['files'].items()}
+        self.recent = cached['recent']
+
+    def _merge_cached(self, cached: Dict) -> None:
+        for path, data in cached['files'].items():
+            older = FileHistory(**data)
+            history = self.files.get(path)
+            if history is None:
+                self.files[path] = older
+            else:
+                history.merge_older(older)
+        self.recent = (self.recent + cached['recent'])[:RECENT_COMMITS]
+
+    def _save_cache(self) -> None:
+        if not self.cache_file or self.from_cache:
+            return
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': GIT_CACHE_VERSION,
+                'project_path': self.project_path,
+                'head': self.head,
+                'recent': self.recent,
+                'files': {path: history.to_dict() for path, history in self.files.items()}
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_file)
@@ -3,59 +3,110 @@ import os
 import json
 import logging
 import argparse
-import sys
+import time
 from datetime import datetime
 from typing import List, Dict, Optional
-from playwright.async_api import async_playwright
+from DZ.browser_pool import BrowserPool, BROWSER_ARGS, CONTEXT_OPTIONS
+from DZ.resource_filter import ResourceFilter
+from DZ.navigation import AdaptiveNavigator
+from DZ.articles import build_articles_data
+from DZ.http_cache import CacheRouter, ResponseCache, CACHE_MODES
+from DZ.screenshots import ScreenshotOptions, ScreenshotPipeline
+from DZ.log_setup import configure_logging
+from DZ.metrics import MetricsRegistry
+
+
+# Скрипт извлечения данных статьи из элемента <article> в ленте Habr
+ARTICLES_EXTRACT_JS = """
+(elements) => elements.map((el) => {
+    const text = (selector) => {
+        const node = el.querySelector(selector);
+        return node ? node.textContent.trim() : null;
+    };
+    const link = el.querySelector('a.tm-title__link, h2 a, .post__title a');
+    const time = el.querySelector('time');
+    return {
+        id: el.id || null,
+        title: link ? link.textContent.trim() : text('h2'),
+        url: link ? link.href : null,
+        author: text('.tm-user-info__username'),
+        published: time ? time.getAttribute('datetime') : null,
+        hubs: Array.from(el.querySelectorAll('.tm-publication-hub__link span:first-child'))
+            .map((node) => node.textContent.trim()),
+        preview: text('.article-formatted-body')
+    };
+})
+"""
 
 
 class HabrAutomation:
     """Класс для автоматизации действий на сайте Habr"""
 
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None,
+                 resource_filter: Optional[ResourceFilter] = None,
+                 navigator: Optional[AdaptiveNavigator] = None,
+                 cache_router: Optional[CacheRouter] = None,
+                 screenshot_options: Optional[ScreenshotOptions] = None,
+                 metrics: Optional[MetricsRegistry] = None):
         self.setup_logging()
+        self.metrics = metrics or MetricsRegistry()
+        self.pool = pool
+        self.resource_filter = resource_filter
+        self.cache_router = cache_router
+        self.screenshots = ScreenshotPipeline(screenshot_options)
+        # Собственный навигатор сохраняет статистику при close(), общий - его владелец
+        self._owns_navigator = navigator is None
+        self.navigator = navigator or AdaptiveNavigator()
+        self.lease = None
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        # Что из маршрутов и обработчиков действительно подключено к контексту
+        self._routers: List = []
+        self._counting_bytes = False
+        self._lease_broken = False
 
     def setup_logging(self) -> None:
-        """Настройка системы логирования"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('habr_automation.log', encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        """Настройка системы логирования (один раз на процесс, запись в фоновом потоке)"""
+        configure_logging()
         self.logger = logging.getLogger(__name__)
 
     async def setup_browser(self, headless: bool = True) -> None:
         """
-        Настройка и запуск браузера
+        Настройка и запуск браузера.
+        Если задан пул, контекст берется из него вместо запуска нового Chromium
         """
+        started = time.monotonic()
         try:
+            if self.pool:
+                self.lease = await self.pool.acquire()
+                self.context = self.lease.context
+                self.browser = self.lease.slot.browser
+                try:
+                    await self._install_routes()
+                    self.page = await self.lease.new_page()
+                except Exception:
+                    # Контекст, на котором не открылась страница, в пул не возвращается
+                    self._lease_broken = True
+                    raise
+                self.metrics.observe_phase('browser_launch', time.monotonic() - started, source='pool')
+                self.logger.info(f"Контекст получен из пула (браузер #{self.lease.slot.index})")
+                return
+
             self.logger.info("Инициализация Playwright...")
+            from playwright.async_api import async_playwright
             self.playwright = await async_playwright().start()
 
             self.logger.info(f"Запуск браузера (headless={headless})...")
             self.browser = await self.playwright.chromium.launch(
                 headless=headless,
-                args=[
-                    '--window-size=1280,720',
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-blink-features=AutomationControlled',
-                    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                ],
+                args=BROWSER_ARGS,
                 timeout=60000
             )
 
-            self.context = await self.browser.new_context(
-                viewport={'width': 1280, 'height': 720},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            )
+            self.context = await self.browser.new_context(**CONTEXT_OPTIONS)
+            await self._install_routes()
 
             self.page = await self.context.new_page()
 
@@ -63,44 +114,67 @@ class HabrAutomation:
             self.page.set_default_timeout(30000)
             self.page.set_default_navigation_timeout(40000)
 
+            self.metrics.observe_phase('browser_launch', time.monotonic() - started, source='launch')
             self.logger.info("Браузер успешно запущен")
 
         except Exception as e:
             self.logger.error(f"Ошибка при запуске браузера: {e}")
             raise
 
-    async def navigate_to_site(self, url: str = "https://habr.com") -> str:
+    async def _install_routes(self) -> None:
+        """Подключение кеша и фильтра ресурсов; фильтр последним, чтобы срабатывать первым"""
+        for router in (self.cache_router, self.resource_filter):
+            if router:
+                await router.install(self.context)
+                self._routers.append(router)
+        self.context.on('response', self._count_bytes)
+        self._counting_bytes = True
+
+    async def _uninstall_routes(self) -> bool:
         """
-        Переход на указанный URL и ожидание загрузки
+        Снятие подключенного в _install_routes. Без исключений: контекст упавшего
+        браузера не дает снять маршруты, но аренду все равно нужно вернуть в пул.
+        Возвращает False, если контекст не удалось очистить
+        """
+        clean = True
+        if self._counting_bytes:
+            self._counting_bytes = False
+            try:
+                self.context.remove_listener('response', self._count_bytes)
+            except Exception as e:
+                self.logger.warning(f"Не удалось снять обработчик ответов: {e}")
+                clean = False
+        while self._routers:
+            router = self._routers.pop()
+            try:
+                await router.uninstall(self.context)
+            except Exception as e:
+                self.logger.warning(f"Не удалось снять маршруты {type(router).__name__}: {e}")
+                clean = False
+        return clean
+
+    def _count_bytes(self, response) -> None:
+        """Учет переданного объема по заголовку Content-Length"""
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            self.metrics.inc('bytes_transferred', int(length), backend='browser')
+
+    async def navigate_to_site(self, url: str = "https://habr.com", fallback: bool = True) -> str:
+        """
+        Переход на указанный URL и ожидание загрузки.
+        fallback=False отключает переход на альтернативный URL при ошибке (нужно для обхода)
         """
         try:
             self.logger.info(f"Переход на сайт: {url}")
 
-            # Пробуем разные стратегии загрузки
-            try:
-                await self.page.goto(url, wait_until='networkidle', timeout=40000)
-            except Exception as network_idle_error:
-                self.logger.warning(f"Networkidle timeout, trying domcontentloaded: {network_idle_error}")
-                await self.page.goto(url, wait_until='domcontentloaded', timeout=40000)
-
-            # Ожидание загрузки основных элементов с разными селекторами
-            selectors_to_wait = [
-                'article',
-                '.tm-articles-list',
-                '.tm-article-snippet',
-                '[class*="article"]',
-                '.post__title'
-            ]
-
-            for selector in selectors_to_wait:
-                try:
-                    await self.page.wait_for_selector(selector, timeout=10000)
-                    self.logger.info(f"Найден селектор: {selector}")
-                    break
-                except Exception:
-                    continue
-            else:
-                self.logger.warning("Не удалось найти ожидаемые элементы на странице")
+            # Ранний коммит и одновременное ожидание селекторов контента
+            result = await self.navigator.navigate(self.page, url)
+            self.metrics.observe_phase('navigation', result.goto_elapsed, wait_until=result.wait_until)
+            self.metrics.observe_phase('selector_wait', result.selector_elapsed,
+                                       found='yes' if result.selector else 'no')
+            if result.attempts > 1:
+                self.metrics.inc('retries', result.attempts - 1, reason='wait_state')
+            self.metrics.inc('pages', status='ok')
 
             self.logger.info("Страница успешно загружена")
 
@@ -114,36 +188,31 @@ class HabrAutomation:
             self.logger.error(f"Ошибка при загрузке страницы: {e}")
 
             # Пробуем альтернативный URL
-            if "habr.com" in url:
+            if fallback and "habr.com" in url:
                 self.logger.info("Пробуем альтернативный URL...")
+                self.metrics.inc('retries', reason='alternative_url')
                 try:
                     alternative_url = "https://habr.com/ru/articles/"
                     await self.page.goto(alternative_url, wait_until='domcontentloaded', timeout=30000)
                     title = await self.page.title()
                     print(f"📄 Заголовок страницы (альтернативный URL): {title}")
+                    self.metrics.inc('pages', status='ok')
                     return title
                 except Exception as alt_error:
                     self.logger.error(f"Ошибка при загрузке альтернативного URL: {alt_error}")
 
+            self.metrics.inc('pages', status='failed')
             raise
 
     async def take_screenshot(self, url: str) -> str:
         """
-        Создание скриншота всей страницы
+        Создание скриншота страницы по параметрам ScreenshotOptions.
+        Файл записывается в фоне, ожидание - в close()
         """
         try:
-            # Создаем папку для скриншотов
-            screenshots_dir = "screenshots"
-            os.makedirs(screenshots_dir, exist_ok=True)
-
-            # Генерируем имя файла
-            domain = url.split('//')[-1].split('/')[0].replace('.', '_')
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{screenshots_dir}/{domain}_{timestamp}.png"
-
-            # Делаем скриншот
-            await self.page.screenshot(path=filename, full_page=True)
-            self.logger.info(f"Скриншот сохранен: {filename}")
+            with self.metrics.timer('screenshot'):
+                filename = await self.screenshots.capture(self.page, url)
+            self.logger.info(f"Скриншот снят: {filename}")
             print(f"📸 Путь к скриншоту: {filename}")
 
             return filename
@@ -152,6 +221,71 @@ class HabrAutomation:
             self.logger.error(f"Ошибка при создании скриншота: {e}")
             raise
 
+    async def extract_articles_data(self, keywords: Optional[List[str]] = None,
+                                    page=None) -> Dict:
+        """
+        Извлечение списка статей со страницы с фильтрацией по ключевым словам
+        """
+        page = page or self.page
+        try:
+            with self.metrics.timer('extraction', backend='browser'):
+                articles = await page.eval_on_selector_all('article', ARTICLES_EXTRACT_JS)
+                data = build_articles_data(page.url, articles, keywords)
+
+            self.logger.info(f"Извлечено статей: {len(data['articles'])} из {data['total_found']}")
+
+            return data
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при извлечении данных: {e}")
+            raise
+
+    async def save_to_json(self, data: Dict, filename: Optional[str] = None) -> str:
+        """
+        Сохранение извлеченных данных в JSON файл
+        """
+        try:
+            results_dir = "results"
+            os.makedirs(results_dir, exist_ok=True)
+
+            if not filename:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"{results_dir}/habr_articles_{timestamp}.json"
+
+            with self.metrics.timer('save'):
+                with open(filename, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+
+            self.logger.info(f"Данные сохранены: {filename}")
+            print(f"💾 Данные сохранены в: {filename}")
+
+            return filename
+
+        except Exception as e:
+            self.logger.error(f"Ошибка при сохранении данных: {e}")
+            raise
+
+    def print_statistics(self, data: Dict) -> None:
+        """Вывод статистики по извлеченным статьям"""
+        articles = data.get('articles', [])
+        authors = {}
+        hubs = {}
+        for article in articles:
+            if article.get('author'):
+                authors[article['author']] = authors.get(article['author'], 0) + 1
+            for hub in article.get('hubs') or []:
+                hubs[hub] = hubs.get(hub, 0) + 1
+
+        print("\n📊 Статистика:")
+        print(f"   Найдено статей: {data.get('total_found', len(articles))}")
+        print(f"   После фильтрации: {len(articles)}")
+        if authors:
+            top_authors = sorted(authors.items(), key=lambda x: x[1], reverse=True)[:5]
+            print(f"   Топ авторов: {', '.join(f'{name} ({count})' for name, count in top_authors)}")
+        if hubs:
+            top_hubs = sorted(hubs.items(), key=lambda x: x[1], reverse=True)[:5]
+            print(f"   Топ хабов: {', '.join(f'{name} ({count})' for name, count in top_hubs)}")
+
     async def check_connection(self) -> bool:
         """
         Проверка подключения к интернету
@@ -169,7 +303,30 @@ class HabrAutomation:
 
     async def close(self) -> None:
         """Корректное закрытие браузера и освобождение ресурсов"""
+        with self.metrics.timer('close'):
+            await self._close()
+
+    async def _close(self) -> None:
+        if self._owns_navigator:
+            self.navigator.save()
+
+        # Дожидаемся фоновой записи скриншотов до закрытия браузера
+        await self.screenshots.close()
+
         try:
+            # Браузер из пула не закрываем, а возвращаем контекст обратно
+            if self.lease:
+                lease, self.lease = self.lease, None
+                healthy = False
+                try:
+                    healthy = await self._uninstall_routes() and not self._lease_broken
+                finally:
+                    # Иначе счетчик аренд слота не уменьшится и acquire будет ждать вечно;
+                    # контекст с неснятыми маршрутами пул заменит новым
+                    await self.pool.release(lease, healthy=healthy)
+                self.logger.info("Контекст возвращен в пул")
+                return
+
             if hasattr(self, 'browser') and self.browser:
                 await self.browser.close()
                 self.logger.info("Браузер закрыт")
@@ -189,17 +346,21 @@ async def run_standalone():
     parser.add_argument('--headless', action='store_true', default=True, help='Headless режим')
     parser.add_argument('--screenshot', action='store_true', default=True, help='Создавать скриншот')
     parser.add_argument('--timeout', type=int, default=40000, help='Таймаут в миллисекундах')
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default='off', help='Запись/воспроизведение ответов')
+    parser.add_argument('--cache-dir', default='.habr_cache', help='Директория кеша ответов')
 
     args = parser.parse_args()
 
-    automation = HabrAutomation()
+    cache = (ResponseCache(args.cache_dir, read_only=args.cache_mode == 'replay')
+             if args.cache_mode != 'off' else None)
+    automation = HabrAutomation(cache_router=CacheRouter(cache, args.cache_mode) if cache else None)
 
     try:
         # Настройка браузера
         await automation.setup_browser(headless=args.headless)
 
-        # Проверка подключения
-        if not await automation.check_connection():
+        # Проверка подключения (при воспроизведении из кеша сеть не нужна)
+        if args.cache_mode != 'replay' and not await automation.check_connection():
             print("❌ Нет подключения к интернету")
             return
 
@@ -229,6 +390,8 @@ async def run_standalone():
 
     finally:
         await automation.close()
+        if cache:
+            cache.save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,240 @@
+"""
+Кеш HTTP-ответов для записи и офлайн-воспроизведения запусков
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from DZ.cli_options import CACHE_MODES
+
+# Заголовки, которые нельзя отдавать повторно после распаковки тела
+SKIP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class ResponseCache:
+    """
+    Контентно-адресуемое хранилище ответов.
+    Тела лежат в objects/<sha256>, индекс сопоставляет метод и URL с телом,
+    статусом и заголовками. Записи устаревают по TTL, при превышении
+    лимита размера удаляются давно не использованные. Запись (record)
+    всегда обновляет ответ из сети, поэтому TTL лишь определяет, когда
+    неиспользуемая запись будет вытеснена. В режиме read_only
+    (воспроизведение) кеш - неизменяемый набор записанных ответов: TTL
+    не действует, ничего не вытесняется и не перезаписывается.
+    """
+
+    def __init__(self, cache_dir: str = '.habr_cache', ttl: Optional[float] = 86400,
+                 max_bytes: int = 200 * 1024 * 1024, read_only: bool = False):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self.logger = logging.getLogger(__name__)
+
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index: Dict[str, Dict] = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            self.logger.warning("Индекс кеша поврежден, начинаем с пустого")
+            return {}
+
+    @staticmethod
+    def _key(method: str, url: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {url}".encode('utf-8')).hexdigest()
+
+    def _object_path(self, body_hash: str) -> str:
+        return os.path.join(self.objects_dir, body_hash[:2], body_hash)
+
+    def _expired(self, entry: Dict, now: float) -> bool:
+        return not self.read_only and self.ttl is not None and now - entry['stored_at'] > self.ttl
+
+    def get(self, method: str, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Статус, заголовки и тело из кеша или None"""
+        key = self._key(method, url)
+        now = time.time()
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None or self._expired(entry, now):
+                self.misses += 1
+                return None
+            try:
+                with open(self._object_path(entry['body_hash']), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                if not self.read_only:
+                    del self.index[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            if not self.read_only:
+                entry['accessed_at'] = now
+                self._dirty = True
+            self.hits += 1
+            return entry['status'], dict(entry['headers']), body
+
+    def put(self, method: str, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """Сохранение ответа; одинаковые тела хранятся один раз"""
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        now = time.time()
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+
+            self.index[self._key(method, url)] = {
+                'method': method.upper(),
+                'url': url,
+                'status': status,
+                'headers': {k: v for k, v in headers.items() if k.lower() not in SKIP_HEADERS},
+                'body_hash': body_hash,
+                'size': len(body),
+                'stored_at': now,
+                'accessed_at': now
+            }
+            self.stored += 1
+            self._dirty = True
+
+    def evict(self) -> int:
+        """Удаление устаревших записей и вытеснение по размеру; возвращает число удаленных"""
+        if self.read_only:
+            return 0
+        now = time.time()
+        removed = 0
+        evicted_hashes = set()
+        with self._lock:
+            for key in [k for k, e in self.index.items() if self._expired(e, now)]:
+                evicted_hashes.add(self.index.pop(key)['body_hash'])
+                removed += 1
+
+            # Размер считаем по уникальным телам
+            refs = Counter(e['body_hash'] for e in self.index.values())
+            sizes = {e['body_hash']: e['size'] for e in self.index.values()}
+            total = sum(sizes.values())
+            for key, entry in sorted(self.index.items(), key=lambda x: x[1]['accessed_at']):
+                if total <= self.max_bytes:
+                    break
+                del self.index[key]
+                removed += 1
+                evicted_hashes.add(entry['body_hash'])
+                refs[entry['body_hash']] -= 1
+                if not refs[entry['body_hash']]:
+                    total -= entry['size']
+
+            if removed:
+                self._dirty = True
+                self._remove_bodies(evicted_hashes)
+        return removed
+
+    def _remove_bodies(self, body_hashes) -> None:
+        """Удаление тел вытесненных записей, на которые больше не ссылается индекс"""
+        referenced = {e['body_hash'] for e in self.index.values()}
+        for body_hash in body_hashes - referenced:
+            try:
+                os.remove(self._object_path(body_hash))
+            except FileNotFoundError:
+                pass
+
+    def save(self) -> None:
+        """Вытеснение и запись индекса на диск"""
+        self.evict()
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.index_file + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_file)
+            self._dirty = False
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'misses': self.misses, 'stored': self.stored,
+                'entries': len(self.index)}
+
+
+class CacheRouter:
+    """
+    Подключение кеша к контексту браузера через context.route.
+    record - запросы всегда идут в сеть и сохраняются, replay - ответы только
+    из кеша, промахи отклоняются без обращения к сети. Чтение и запись файлов
+    кеша выполняются в потоке, чтобы не блокировать цикл событий.
+    """
+
+    def __init__(self, cache: ResponseCache, mode: str = 'record'):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Неизвестный режим кеша: {mode}")
+        self.cache = cache
+        self.mode = mode
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    async def install(self, context) -> None:
+        """Подключение к контексту; должно выполняться до ResourceFilter.install"""
+        if self.enabled:
+            await context.route('**/*', self._handle_route)
+
+    async def uninstall(self, context) -> None:
+        if self.enabled:
+            await context.unroute('**/*', self._handle_route)
+
+    async def _handle_route(self, route) -> None:
+        request = route.request
+        if request.method not in ('GET', 'HEAD'):
+            if self.mode == 'replay':
+                await route.abort('internetdisconnected')
+            else:
+                await route.continue_()
+            return
+
+        if self.mode == 'replay':
+            cached = await asyncio.to_thread(self.cache.get, request.method, request.url)
+            if cached is None:
+                await route.abort('internetdisconnected')
+                return
+            status, headers, body = cached
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            # Без abort запрос так и остался бы висеть в ожидании ответа
+            self.logger.warning(f"Не удалось загрузить {request.url} для кеша: {e}")
+            await route.abort('failed')
+            return
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in SKIP_HEADERS}
+        await route.fulfill(status=response.status, headers=headers, body=body)
+        # Страница получает ответ сразу, запись на диск идет после
+        try:
+            await asyncio.to_thread(self.cache.put, request.method, request.url,
+                                    response.status, response.headers, body)
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить {request.url} в кеш: {e}")
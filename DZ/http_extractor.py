@@ -0,0 +1,203 @@
+"""
+Быстрое извлечение статей через HTTP и lxml без запуска браузера
+"""
+
+import asyncio
+import gzip
+import http.client
+import logging
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from lxml import etree, html as lxml_html
+from DZ.articles import build_articles_data
+from DZ.http_cache import ResponseCache
+from DZ.metrics import MetricsRegistry
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept-Language': 'ru,en;q=0.8',
+    'Connection': 'keep-alive'
+}
+
+# XPath-селекторы ленты Habr (аналог ARTICLES_EXTRACT_JS из habr_automation)
+ARTICLE_XPATH = '//article'
+TITLE_LINK_XPATH = (".//a[contains(@class, 'tm-title__link')] | .//h2//a"
+                    " | .//*[contains(@class, 'post__title')]//a")
+AUTHOR_XPATH = ".//a[contains(@class, 'tm-user-info__username')]"
+HUBS_XPATH = ".//a[contains(@class, 'tm-publication-hub__link')]/span[1]"
+PREVIEW_XPATH = ".//div[contains(@class, 'article-formatted-body')]"
+
+
+class HttpConnectionPool:
+    """
+    Пул постоянных HTTP(S)-соединений по хостам с поддержкой gzip.
+    С кешем в режиме record ответы сохраняются, в режиме replay сеть не используется.
+    Полученные из сети байты (до распаковки) учитываются в bytes_transferred
+    с меткой backend="http", как ответы браузера - с backend="browser"
+    """
+
+    def __init__(self, timeout: float = 20.0, max_redirects: int = 5,
+                 cache: Optional[ResponseCache] = None, cache_mode: str = 'off',
+                 metrics: Optional[MetricsRegistry] = None):
+        self.timeout = timeout
+        self.metrics = metrics
+        self.max_redirects = max_redirects
+        self.cache = cache if cache_mode != 'off' else None
+        self.cache_mode = cache_mode
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def _get_connection(self, scheme: str, host: str) -> http.client.HTTPConnection:
+        with self._lock:
+            connections = self._idle.get((scheme, host))
+            if connections:
+                return connections.pop()
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, timeout=self.timeout)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def _put_connection(self, scheme: str, host: str, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault((scheme, host), []).append(connection)
+
+    def get(self, url: str) -> Tuple[int, str, bytes]:
+        """GET-запрос с переходом по редиректам; возвращает статус, итоговый URL и тело"""
+        for _ in range(self.max_redirects + 1):
+            status, headers, body = self._request(url)
+            location = headers.get('location')
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return status, url, body
+        raise http.client.HTTPException(f"Слишком много перенаправлений: {url}")
+
+    def _request(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        # Ключ кеша в том же виде, что и URL запроса в браузере
+        url = f"{parsed.scheme}://{parsed.netloc}{path}"
+
+        if self.cache and self.cache_mode == 'replay':
+            cached = self.cache.get('GET', url)
+            if cached is None:
+                raise http.client.HTTPException(f"Нет в кеше: {url}")
+            status, headers, body = cached
+            return status, {key.lower(): value for key, value in headers.items()}, body
+
+        status, headers, body = self._network_request(parsed, path)
+        if self.cache:
+            self.cache.put('GET', url, status, headers, body)
+        return status, headers, body
+
+    def _network_request(self, parsed, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        # Повтор на свежем соединении, если сервер закрыл простаивающее
+        for attempt in range(2):
+            connection = self._get_connection(parsed.scheme, parsed.netloc)
+            try:
+                connection.request('GET', path, headers=DEFAULT_HEADERS)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                if attempt:
+                    raise
+                continue
+
+            headers = {key.lower(): value for key, value in response.getheaders()}
+            if self.metrics:
+                self.metrics.inc('bytes_transferred', len(body), backend='http')
+            if response.will_close:
+                connection.close()
+            else:
+                self._put_connection(parsed.scheme, parsed.netloc, connection)
+            return response.status, headers, self._decode(body, headers.get('content-encoding'))
+
+    @staticmethod
+    def _decode(body: bytes, encoding: Optional[str]) -> bytes:
+        if encoding == 'gzip':
+            return gzip.decompress(body)
+        if encoding == 'deflate':
+            return zlib.decompress(body)
+        return body
+
+    def close(self) -> None:
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+def _text(element, xpath: str) -> Optional[str]:
+    nodes = element.xpath(xpath)
+    return nodes[0].text_content().strip() if nodes else None
+
+
+def parse_articles(content: bytes, base_url: str) -> List[Dict]:
+    """Разбор статей из HTML ленты; формат совпадает с браузерным извлечением"""
+    tree = lxml_html.fromstring(content, base_url=base_url)
+    articles = []
+    for element in tree.xpath(ARTICLE_XPATH):
+        links = element.xpath(TITLE_LINK_XPATH)
+        link = links[0] if links else None
+        times = element.xpath('.//time/@datetime')
+        articles.append({
+            'id': element.get('id'),
+            'title': link.text_content().strip() if link is not None else _text(element, './/h2'),
+            'url': urljoin(base_url, link.get('href')) if link is not None and link.get('href') else None,
+            'author': _text(element, AUTHOR_XPATH),
+            'published': times[0] if times else None,
+            'hubs': [node.text_content().strip() for node in element.xpath(HUBS_XPATH)],
+            'preview': _text(element, PREVIEW_XPATH)
+        })
+    return articles
+
+
+class HttpArticleExtractor:
+    """
+    Извлечение статей из серверно-отрисованных страниц по HTTP.
+    Возвращает None, если страница требует JS (нет статей в HTML) или ее
+    не удалось загрузить и разобрать, чтобы вызывающий код переключился
+    на HabrAutomation; причина сохраняется в last_error.
+    """
+
+    def __init__(self, pool: Optional[HttpConnectionPool] = None):
+        self.pool = pool or HttpConnectionPool()
+        self.logger = logging.getLogger(__name__)
+        self.last_error: Optional[str] = None
+
+    def _fail(self, message: str, level: int = logging.WARNING) -> None:
+        self.last_error = message
+        self.logger.log(level, message)
+
+    async def extract_articles_data(self, url: str, keywords: Optional[List[str]] = None) -> Optional[Dict]:
+        self.last_error = None
+        try:
+            status, final_url, content = await asyncio.to_thread(self.pool.get, url)
+        except (OSError, EOFError, zlib.error, http.client.HTTPException) as e:
+            # EOFError и zlib.error - обрезанное или битое gzip/deflate-тело
+            return self._fail(f"HTTP-загрузка не удалась ({url}): {e}")
+
+        if status != 200:
+            return self._fail(f"HTTP {status} для {url}, нужен браузер")
+
+        try:
+            articles = await asyncio.to_thread(parse_articles, content, final_url)
+        except (etree.LxmlError, ValueError) as e:
+            # Например, пустое тело ответа: "Document is empty"
+            return self._fail(f"Не удалось разобрать HTML ({url}): {e}")
+        if not articles:
+            return self._fail(f"В HTML нет статей, страница требует JS: {url}", logging.INFO)
+
+        data = build_articles_data(final_url, articles, keywords)
+        self.logger.info(f"Извлечено статей по HTTP: {len(data['articles'])} из {data['total_found']}")
+        return data
+
+    def close(self) -> None:
+        self.pool.close()
@@ -0,0 +1,277 @@
+"""
+Проверка времени импорта подкоманд CLI по выводу python -X importtime
+"""
+
+import ast
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+# Базовый импорт CLI: разбор аргументов до запуска подкоманды
+CLI_MODULE = 'DZ.main'
+CLI_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+BASE_COMMAND = 'cli'
+
+# Пакеты, которые не должны загружаться при импорте: Playwright нужен
+# только при запуске браузера, lxml - при извлечении по HTTP, Pillow - для WebP,
+# asyncio - только асинхронным подкомандам
+FORBIDDEN_IMPORTS: Dict[str, Tuple[str, ...]] = {
+    BASE_COMMAND: ('asyncio', 'playwright', 'lxml', 'PIL'),
+    'habr': ('playwright', 'PIL'),
+    'crawl': ('playwright', 'PIL'),
+    'analyze': ('asyncio', 'playwright', 'lxml', 'PIL', 'multiprocessing'),
+    'bench': ('playwright', 'lxml'),
+    'loadtest': ('playwright', 'lxml'),
+    'importtime': ('asyncio', 'playwright', 'lxml', 'PIL'),
+}
+
+# Бюджет суммарного времени импорта (без запуска интерпретатора и site) в долях
+# от импортов самого интерпретатора при python -c pass: абсолютные миллисекунды
+# зависят от машины, а отношение к этой базе почти нет
+BUDGET_RATIOS: Dict[str, float] = {
+    BASE_COMMAND: 7.0,
+    'habr': 36.0,
+    'crawl': 36.0,
+    'analyze': 18.0,
+    'bench': 36.0,
+    'loadtest': 30.0,
+    'importtime': 10.0,
+}
+
+# Общий множитель бюджетов для медленных или шумных машин (CI под нагрузкой)
+BUDGET_SCALE_ENV = 'IMPORT_BUDGET_SCALE'
+
+
+def _function_imports(function: ast.AST) -> Set[str]:
+    modules = set()
+    for node in ast.walk(function):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            if node.module == 'DZ':
+                # from DZ import benchmark
+                modules.update(f"DZ.{alias.name}" for alias in node.names)
+            else:
+                modules.add(node.module)
+    return modules
+
+
+def command_imports(cli_file: str = CLI_FILE) -> Dict[str, Tuple[str, ...]]:
+    """
+    Модули, которые подкоманды загружают лениво, по исходнику main.py:
+    импорты внутри обработчика из COMMAND_HANDLERS и вызываемых им функций
+    модуля; асинхронным обработчикам main() дополнительно импортирует asyncio.
+    """
+    with open(cli_file, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    functions = {node.name: node for node in tree.body
+                 if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    handlers = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == 'COMMAND_HANDLERS'
+                                                for target in node.targets):
+            handlers = {key.value: value.id for key, value in zip(node.value.keys, node.value.values)}
+    if not handlers:
+        raise RuntimeError(f"В {cli_file} не найден COMMAND_HANDLERS")
+
+    result: Dict[str, Tuple[str, ...]] = {BASE_COMMAND: ()}
+    for command, handler in handlers.items():
+        modules = set()
+        if isinstance(functions[handler], ast.AsyncFunctionDef):
+            modules.add('asyncio')
+        seen = set()
+        pending = [handler]
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            modules.update(_function_imports(functions[name]))
+            pending.extend(node.func.id for node in ast.walk(functions[name])
+                           if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                           and node.func.id in functions)
+        result[command] = tuple(sorted(modules))
+    return result
+
+
+ImportEntry = Tuple[str, int, int, int]
+
+
+def parse_importtime(output: str) -> List[ImportEntry]:
+    """
+    Разбор stderr python -X importtime в список (имя, глубина, self мкс,
+    cumulative мкс). Строки идут в порядке завершения импорта: вложенные
+    модули выводятся раньше импортировавшего их и с большим отступом.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|', 2)
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # заголовок таблицы
+        name_field = fields[2]
+        name = name_field.strip()
+        depth = (len(name_field) - len(name_field.lstrip()) - 1) // 2
+        entries.append((name, depth, int(fields[0]), int(fields[1])))
+    return entries
+
+
+def import_chain(entries: List[ImportEntry], index: int) -> List[str]:
+    """Цепочка импортов от модуля верхнего уровня до entries[index]"""
+    chain = [entries[index][0]]
+    depth = entries[index][1]
+    for name, entry_depth, _, _ in entries[index + 1:]:
+        if entry_depth < depth:
+            chain.append(name)
+            depth = entry_depth
+    return list(reversed(chain))
+
+
+def _is_project_module(name: str) -> bool:
+    return name == 'DZ' or name.startswith('DZ.')
+
+
+def _matches(name: str, package: str) -> bool:
+    return name == package or name.startswith(package + '.')
+
+
+def _run_importtime(code: str, python: str) -> str:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=project_root)
+    result = subprocess.run([python, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=project_root, env=env, timeout=60)
+    if result.returncode != 0:
+        raise RuntimeError(f"{code} завершился с ошибкой:\n{result.stderr.strip()[-2000:]}")
+    return result.stderr
+
+
+def measure_command(command: str, python: str = sys.executable,
+                    imports: Optional[Dict[str, Tuple[str, ...]]] = None) -> List[ImportEntry]:
+    """Импорт модулей подкоманды в отдельном интерпретаторе с -X importtime"""
+    imports = imports or command_imports()
+    modules = ', '.join((CLI_MODULE,) + imports[command])
+    return parse_importtime(_run_importtime(f"import {modules}", python))
+
+
+def measure_baseline(python: str = sys.executable, repeat: int = 3) -> int:
+    """
+    База для бюджетов, мкс: импорты запуска интерпретатора (encodings, site)
+    при python -c pass, лучший из repeat запусков
+    """
+    return min(sum(cumulative for _, depth, _, cumulative in parse_importtime(_run_importtime('pass', python))
+                   if not depth)
+               for _ in range(max(1, repeat)))
+
+
+def budget_scale(scale: Optional[float] = None) -> float:
+    """Множитель бюджетов: явное значение или переменная окружения IMPORT_BUDGET_SCALE"""
+    if scale is None:
+        value = os.environ.get(BUDGET_SCALE_ENV)
+        if not value:
+            return 1.0
+        try:
+            scale = float(value)
+        except ValueError:
+            raise ValueError(f"{BUDGET_SCALE_ENV} должна быть числом, получено {value!r}")
+    if scale <= 0:
+        raise ValueError(f"Множитель бюджета должен быть положительным, получено {scale}")
+    return scale
+
+
+def _total_us(entries: List[ImportEntry]) -> int:
+    """Время импортов команды -c: все верхнего уровня, начиная с пакета DZ"""
+    total = 0
+    counting = False
+    for name, depth, _, cumulative in entries:
+        if depth:
+            continue
+        counting = counting or _is_project_module(name)
+        if counting:
+            total += cumulative
+    return total
+
+
+def check_command(command: str, budget_ms: Optional[float] = None, repeat: int = 3,
+                  top: int = 5, python: str = sys.executable,
+                  imports: Optional[Dict[str, Tuple[str, ...]]] = None,
+                  baseline_us: Optional[int] = None, scale: Optional[float] = None) -> Dict:
+    """
+    Замер времени импорта подкоманды: лучший из repeat запусков, чтобы
+    первый холодный запуск и шум системы не давали ложных регрессий.
+    Время включает все, что загрузили main.py и модули подкоманды, но не
+    запуск интерпретатора и site. Без явного budget_ms бюджет считается
+    как BUDGET_RATIOS * база python -c pass * множитель.
+    """
+    if baseline_us is None:
+        baseline_us = measure_baseline(python, repeat)
+    if budget_ms is None:
+        # Новая подкоманда без своего бюджета проверяется по бюджету разбора аргументов
+        ratio = BUDGET_RATIOS.get(command, BUDGET_RATIOS[BASE_COMMAND])
+        budget_ms = round(ratio * baseline_us / 1000 * budget_scale(scale), 1)
+    imports = imports or command_imports()
+
+    best_entries: List[ImportEntry] = []
+    best_total = None
+    for _ in range(max(1, repeat)):
+        entries = measure_command(command, python, imports)
+        total = _total_us(entries)
+        if best_total is None or total < best_total:
+            best_total, best_entries = total, entries
+
+    forbidden = []
+    for package in FORBIDDEN_IMPORTS.get(command, ()):
+        for index, entry in enumerate(best_entries):
+            if _matches(entry[0], package):
+                forbidden.append({'package': package, 'chain': import_chain(best_entries, index)})
+                break
+
+    heaviest = sorted(best_entries, key=lambda entry: entry[2], reverse=True)[:top]
+    total_ms = best_total / 1000
+    return {
+        'command': command,
+        'imports': list(imports[command]),
+        'total_ms': round(total_ms, 1),
+        'budget_ms': budget_ms,
+        'baseline_ms': round(baseline_us / 1000, 1),
+        'modules': len(best_entries),
+        'over_budget': total_ms > budget_ms,
+        'forbidden': forbidden,
+        'heaviest': [{'module': name, 'self_ms': round(self_us / 1000, 1)}
+                     for name, _, self_us, _ in heaviest]
+    }
+
+
+def check_commands(commands: Optional[List[str]] = None, budget_ms: Optional[float] = None,
+                   repeat: int = 3, top: int = 5, scale: Optional[float] = None) -> List[Dict]:
+    imports = command_imports()
+    # База меряется один раз на весь прогон, чтобы бюджеты команд были сопоставимы
+    scale = budget_scale(scale)
+    baseline_us = measure_baseline(repeat=repeat)
+    return [check_command(command, budget_ms, repeat, top, imports=imports,
+                          baseline_us=baseline_us, scale=scale)
+            for command in (commands or list(imports))]
+
+
+def has_violations(reports: List[Dict]) -> bool:
+    return any(report['over_budget'] or report['forbidden'] for report in reports)
+
+
+def print_reports(reports: List[Dict]) -> None:
+    if reports:
+        print(f"📏 База python -c pass: {reports[0]['baseline_ms']:.1f} мс")
+    for report in reports:
+        mark = '❌' if report['over_budget'] or report['forbidden'] else '✅'
+        print(f"{mark} {report['command']}: {report['total_ms']:.1f} мс из {report['budget_ms']:g} мс "
+              f"({report['modules']} модулей)")
+        for item in report['forbidden']:
+            print(f"   🚫 Загружен {item['package']}: {' -> '.join(item['chain'])}")
+        if report['over_budget']:
+            heaviest = ', '.join(f"{item['module']} {item['self_ms']} мс" for item in report['heaviest'])
+            print(f"   🐢 Самые тяжелые: {heaviest}")
+    if has_violations(reports):
+        print("❌ Бюджет времени импорта превышен")
+    else:
+        print("✅ Время импорта в пределах бюджета")
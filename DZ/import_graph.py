@@ -0,0 +1,249 @@
+"""
+Граф импортов модулей проекта: разрешение относительных импортов, обратные
+зависимости, транзитивные замыкания и циклы
+"""
+
+import json
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Set
+from DZ.cli_options import GRAPH_FORMATS
+from DZ.code_model import CodeModel, ImportRef, ModuleRecord, module_name_from_path
+
+# Размер буфера файлов графа
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+class ImportGraph:
+    """
+    Индекс смежности импортов между модулями проекта: прямые и обратные ребра
+    хранятся множествами по имени модуля, поэтому запросы соседей - O(1),
+    обходы - линейны по затронутой части графа. Импорты внешних пакетов
+    в граф не попадают.
+    """
+
+    def __init__(self):
+        self.forward: Dict[str, Set[str]] = {}
+        self.reverse: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_model(cls, model: CodeModel) -> 'ImportGraph':
+        graph = cls()
+        for module in model.modules.values():
+            graph._add_node(module.name)
+        for module in model.modules.values():
+            graph.set_imports(module.name, graph.resolve_module(module))
+        return graph
+
+    def __len__(self) -> int:
+        return len(self.forward)
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.forward.values())
+
+    def _add_node(self, name: str) -> None:
+        self.forward.setdefault(name, set())
+        self.reverse.setdefault(name, set())
+
+    def resolve(self, importer: str, ref: ImportRef, is_package: bool = False) -> Set[str]:
+        """
+        Модули проекта, на которые указывает импорт. from pkg import name
+        дает pkg.name, если это модуль, иначе сам pkg; относительные импорты
+        отсчитываются от пакета импортирующего модуля (для __init__.py - от
+        самого пакета).
+        """
+        level, module, names = ref
+        if level:
+            parts = importer.split('.')
+            drop = level - 1 if is_package else level
+            if drop > len(parts):
+                return set()
+            base = '.'.join(parts[:len(parts) - drop] + ([module] if module else []))
+        else:
+            base = module
+
+        targets = set()
+        unresolved = not names
+        for name in names:
+            candidate = f"{base}.{name}" if base else name
+            if candidate in self.forward:
+                targets.add(candidate)
+            else:
+                unresolved = True
+        if unresolved and base in self.forward:
+            targets.add(base)
+        targets.discard(importer)
+        return targets
+
+    def resolve_module(self, module: ModuleRecord) -> Set[str]:
+        targets = set()
+        for ref in module.import_refs:
+            targets.update(self.resolve(module.name, ref, module.is_package))
+        return targets
+
+    def set_imports(self, name: str, targets: Iterable[str]) -> None:
+        """Замена исходящих ребер модуля (добавляет модуль, если его не было)"""
+        self._add_node(name)
+        for target in self.forward[name]:
+            self.reverse[target].discard(name)
+        self.forward[name] = set(targets)
+        for target in self.forward[name]:
+            self.reverse.setdefault(target, set()).add(name)
+            self.forward.setdefault(target, set())
+
+    def remove_module(self, name: str) -> Set[str]:
+        """Удаление модуля вместе с ребрами; возвращает модули, которые его импортировали"""
+        for target in self.forward.pop(name, set()):
+            self.reverse[target].discard(name)
+        dependents = self.reverse.pop(name, set())
+        for source in dependents:
+            self.forward[source].discard(name)
+        return dependents
+
+    def normalize(self, name: str) -> str:
+        """Имя модуля по имени или пути к файлу"""
+        if name.endswith('.py'):
+            return module_name_from_path(os.path.normpath(name))
+        return name
+
+    def dependencies(self, name: str) -> Set[str]:
+        return set(self.forward.get(name, ()))
+
+    def dependents(self, name: str) -> Set[str]:
+        """Модули, напрямую импортирующие name"""
+        return set(self.reverse.get(name, ()))
+
+    def _closure(self, start: str, edges: Dict[str, Set[str]]) -> Set[str]:
+        seen = set()
+        queue = deque(edges.get(start, ()))
+        while queue:
+            name = queue.popleft()
+            if name in seen:
+                continue
+            seen.add(name)
+            queue.extend(edges.get(name, ()) - seen)
+        seen.discard(start)
+        return seen
+
+    def transitive_dependencies(self, name: str) -> Set[str]:
+        return self._closure(name, self.forward)
+
+    def affected_by(self, name: str) -> Set[str]:
+        """Все модули, которые прямо или через цепочку импортов зависят от name"""
+        return self._closure(name, self.reverse)
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Компоненты сильной связности (итеративный алгоритм Тарьяна)"""
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in sorted(self.forward):
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.forward[root])))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                child = next(children, None)
+                if child is not None:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self.forward[child]))))
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+
+        return components
+
+    def cycles(self) -> List[List[str]]:
+        """Группы модулей с циклическими импортами"""
+        return sorted(component for component in self.strongly_connected_components()
+                      if len(component) > 1)
+
+    def collapsed_edges(self, depth: int = 0) -> Dict[str, Set[str]]:
+        """Ребра между группами модулей по первым depth частям имени (0 - без свертки)"""
+        if not depth:
+            return self.forward
+
+        def group(name: str) -> str:
+            return '.'.join(name.split('.')[:depth])
+
+        edges: Dict[str, Set[str]] = {}
+        for source, targets in self.forward.items():
+            source_group = group(source)
+            bucket = edges.setdefault(source_group, set())
+            for target in targets:
+                target_group = group(target)
+                if target_group != source_group:
+                    bucket.add(target_group)
+        for targets in list(edges.values()):
+            for target in targets:
+                edges.setdefault(target, set())
+        return edges
+
+    def write(self, path: str, graph_format: str = 'dot', depth: int = 0) -> None:
+        """Потоковая запись графа в DOT, PlantUML или JSON"""
+        if graph_format not in GRAPH_FORMATS:
+            raise ValueError(f"Неизвестный формат графа: {graph_format}")
+        edges = self.collapsed_edges(depth)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            if graph_format == 'json':
+                f.write('{\n  "nodes": ')
+                f.write(json.dumps(sorted(edges)))
+                f.write(',\n  "edges": [')
+                first = True
+                for source in sorted(edges):
+                    for target in sorted(edges[source]):
+                        f.write(f'{"" if first else ","}\n    {json.dumps([source, target])}')
+                        first = False
+                f.write('\n  ]\n}\n')
+            elif graph_format == 'dot':
+                f.write('digraph imports {\n  rankdir=LR;\n  node [shape=box, fontsize=10];\n')
+                for source in sorted(edges):
+                    f.write(f'  "{source}";\n')
+                    for target in sorted(edges[source]):
+                        f.write(f'  "{source}" -> "{target}";\n')
+                f.write('}\n')
+            else:
+                f.write('@startuml\n')
+                for source in sorted(edges):
+                    f.write(f'component "{source}" as {source.replace(".", "_")}\n')
+                for source in sorted(edges):
+                    for target in sorted(edges[source]):
+                        f.write(f'{source.replace(".", "_")} ..> {target.replace(".", "_")}\n')
+                f.write('@enduml\n')
+
+    def print_summary(self) -> None:
+        cycles = self.cycles()
+        print(f"🕸️  Граф импортов: {len(self)} модулей, {self.edge_count} связей, циклов: {len(cycles)}")
@@ -0,0 +1,15 @@
+"""
+Запись отчетов (бенчмарки, нагрузочный тест, время импорта) в JSON
+"""
+
+import json
+import os
+from typing import Any
+
+
+def save_report(data: Any, path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,114 @@
+"""
+Неблокирующая настройка логирования: запись в файл и консоль в фоновом потоке
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Поля, которые можно передать через extra=... для структурированных записей
+EXTRA_FIELDS = ('url', 'phase', 'elapsed_ms', 'wait_until', 'selector', 'status', 'bytes')
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional['TracebackQueueHandler'] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-запись на строку с полями времени по URL"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for field in EXTRA_FIELDS:
+            if hasattr(record, field):
+                data[field] = getattr(record, field)
+        # Через очередь исключение приходит уже отформатированным в exc_text
+        exception = record.exc_text
+        if record.exc_info and not exception:
+            exception = self.formatException(record.exc_info)
+        if exception:
+            data['exception'] = exception
+        if record.stack_info:
+            data['stack'] = record.stack_info
+        return json.dumps(data, ensure_ascii=False)
+
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, который сохраняет трассировку: стандартный prepare()
+    склеивает ее с текстом сообщения и обнуляет exc_info и exc_text, и
+    JsonFormatter в потоке слушателя не видел исключения. Здесь в сообщение
+    подставляются аргументы, а трассировка переносится в exc_text.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            # Трассировка не нужна после форматирования и держала бы кадры стека
+            record.exc_info = None
+        return record
+
+
+def configure_logging(log_file: str = 'habr_automation.log', json_format: bool = False,
+                      level: int = logging.INFO) -> None:
+    """
+    Настройка логирования один раз на процесс.
+    Вызовы из кода только кладут запись в очередь, файловый и консольный
+    обработчики работают в потоке QueueListener. Повторные вызовы ничего не меняют.
+    """
+    global _listener, _queue_handler
+
+    with _lock:
+        if _listener is not None:
+            return
+
+        formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+        handlers = [
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.setLevel(level)
+        _queue_handler = TracebackQueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописывает оставшиеся записи и останавливает фоновый поток"""
+    global _listener, _queue_handler
+
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
@@ -1,61 +1,447 @@
 """
-Основной скрипт для браузерной автоматизации и анализа кода
+Основной скрипт для браузерной автоматизации и анализа кода.
+
+Для разбора аргументов импортируется только cli_options; модули подкоманд
+(asyncio, Playwright, lxml, анализатор, бенчмарки) загружаются внутри
+обработчиков из COMMAND_HANDLERS. Модули каждой подкоманды import_budget
+выводит из этих импортов и проверяет бюджет времени импорта
+(python -m DZ.main importtime).
 """
 
-import asyncio
 import argparse
-from DZ.habr_automation import HabrAutomation
-from DZ.code_analyzer import CodeDocumentationGenerator
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, Optional
+from DZ.cli_options import (CACHE_MODES, DEFAULT_TOLERANCE, GRAPH_FORMATS, PAYMENT_PAGE, PRESETS,
+                            SCREENSHOT_FORMATS, SCREENSHOT_MODES)
+
+if TYPE_CHECKING:
+    from DZ.article_sink import JsonlArticleSink
+    from DZ.code_analyzer import CodeDocumentationGenerator
+    from DZ.http_cache import ResponseCache
+    from DZ.metrics import MetricsRegistry
+    from DZ.navigation import AdaptiveNavigator
+    from DZ.resource_filter import ResourceFilter
+
+
+def build_resource_filter(args) -> 'ResourceFilter':
+    """Создание фильтра ресурсов из аргументов командной строки"""
+    from DZ.resource_filter import ResourceFilter
+
+    return ResourceFilter(
+        preset=args.resource_preset,
+        resource_types=args.block_types,
+        deny_domains=args.block_domains,
+        allow_domains=args.allow_domains
+    )
+
+
+def add_resource_filter_arguments(parser) -> None:
+    """Общие аргументы фильтрации запросов для habr и crawl"""
+    parser.add_argument('--resource-preset', choices=sorted(PRESETS), default='full',
+                        help='Предустановка фильтра ресурсов (text-only - только текст)')
+    parser.add_argument('--block-types', nargs='+', help='Дополнительно блокируемые типы ресурсов')
+    parser.add_argument('--block-domains', nargs='+', help='Блокируемые домены')
+    parser.add_argument('--allow-domains', nargs='+', help='Разрешенные домены (остальные блокируются)')
+
+
+def build_cache(args) -> Optional['ResponseCache']:
+    """Создание кеша ответов, если включена запись или воспроизведение"""
+    from DZ.http_cache import ResponseCache
+
+    if args.cache_mode == 'off':
+        return None
+    return ResponseCache(args.cache_dir, ttl=args.cache_ttl or None,
+                         max_bytes=args.cache_max_mb * 1024 * 1024,
+                         read_only=args.cache_mode == 'replay')
+
+
+def add_cache_arguments(parser) -> None:
+    """Общие аргументы кеша ответов для habr и crawl"""
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default='off',
+                        help='record - всегда запрашивать сеть и обновлять кеш, '
+                             'replay - работать только из кеша')
+    parser.add_argument('--cache-dir', default='.habr_cache', help='Директория кеша ответов')
+    parser.add_argument('--cache-ttl', type=float, default=86400,
+                        help='Через сколько секунд запись вытесняется при сохранении кеша '
+                             '(0 - без ограничения; replay не вытесняет)')
+    parser.add_argument('--cache-max-mb', type=int, default=200, help='Максимальный размер кеша, МБ')
+
+
+def build_navigator(args) -> 'AdaptiveNavigator':
+    """Навигатор со статистикой в директории кеша, в --nav-stats или без сохранения"""
+    from DZ.navigation import NAVIGATION_STATS_FILE, AdaptiveNavigator
+
+    stats_file = None
+    if not args.no_nav_stats:
+        stats_file = args.nav_stats or os.path.join(args.cache_dir, NAVIGATION_STATS_FILE)
+    return AdaptiveNavigator(stats_file=stats_file)
+
+
+def build_sink(args) -> Optional['JsonlArticleSink']:
+    """Потоковая запись в JSONL вместо одного JSON в конце"""
+    from DZ.article_sink import JsonlArticleSink
+
+    if args.output_format != 'jsonl':
+        return None
+    return JsonlArticleSink(args.jsonl_path, index_path=args.seen_index, keywords=args.keywords)
+
+
+def add_output_arguments(parser) -> None:
+    """Общие аргументы формата вывода для habr и crawl"""
+    parser.add_argument('--output-format', choices=['json', 'jsonl'], default='json',
+                        help='jsonl - запись каждой статьи сразу с пропуском уже сохраненных')
+    parser.add_argument('--jsonl-path', default='results/habr_articles.jsonl', help='Файл JSONL')
+    parser.add_argument('--seen-index', help='Файл индекса сохраненных статей (по умолчанию рядом с JSONL)')
+
+
+def export_metrics(metrics: 'MetricsRegistry', args) -> None:
+    """Сводка по фазам и выгрузка метрик в файл (.json или формат Prometheus)"""
+    metrics.print_summary()
+    if args.metrics_file:
+        metrics.export(args.metrics_file)
+        print(f"📈 Метрики сохранены в: {args.metrics_file}")
 
 
 async def run_habr_automation(args):
     """Запуск автоматизации Habr"""
+    from DZ.habr_automation import HabrAutomation
+    from DZ.http_cache import CacheRouter
+    from DZ.http_extractor import HttpArticleExtractor, HttpConnectionPool
+    from DZ.log_setup import configure_logging
+    from DZ.metrics import MetricsRegistry
+    from DZ.screenshots import ScreenshotOptions
+
+    configure_logging(json_format=args.log_json)
+
     print("🚀 Запуск автоматизации Habr...")
 
-    automation = HabrAutomation()
+    resource_filter = build_resource_filter(args)
+    cache = build_cache(args)
+    cache_router = CacheRouter(cache, args.cache_mode) if cache else None
+    screenshot_options = ScreenshotOptions(
+        image_format=args.screenshot_format,
+        quality=args.screenshot_quality,
+        mode=args.screenshot_mode,
+        selector=args.screenshot_selector,
+        max_height=args.screenshot_max_height,
+        thumbnail_width=args.screenshot_thumbnail
+    )
+    metrics = MetricsRegistry()
+    navigator = build_navigator(args)
+    automation = HabrAutomation(resource_filter=resource_filter, navigator=navigator,
+                                cache_router=cache_router, screenshot_options=screenshot_options,
+                                metrics=metrics)
+    sink = build_sink(args)
+    # При потоковой записи ключевые слова применяет sink
+    keywords = None if sink else args.keywords
 
     try:
-        # Настройка браузера
-        await automation.setup_browser(headless=args.headless)
+        articles_data = None
+
+        # Быстрый путь без браузера; скриншоту нужна страница, поэтому в auto только без него
+        if args.backend == 'auto' and args.screenshot:
+            print("ℹ️  Скриншот требует браузер: HTTP-путь пропущен (--no-screenshot включает его)")
+        if args.backend == 'http' or (args.backend == 'auto' and not args.screenshot):
+            extractor = HttpArticleExtractor(HttpConnectionPool(cache=cache, cache_mode=args.cache_mode,
+                                                                metrics=metrics))
+            try:
+                with metrics.timer('extraction', backend='http'):
+                    articles_data = await extractor.extract_articles_data(args.url, keywords)
+            finally:
+                extractor.close()
+            if articles_data is not None:
+                metrics.inc('pages', status='ok', backend='http')
+
+            if articles_data is None and args.backend == 'http':
+                print(f"❌ Извлечение по HTTP невозможно: {extractor.last_error}")
+                return
+
+        if articles_data is None:
+            # Настройка браузера
+            await automation.setup_browser(headless=args.headless)
 
-        # Переход на сайт
-        title = await automation.navigate_to_site(args.url)
+            # Переход на сайт
+            title = await automation.navigate_to_site(args.url)
 
-        # Создание скриншота
-        if args.screenshot:
-            screenshot_path = await automation.take_screenshot(args.url)
+            # Создание скриншота
+            if args.screenshot:
+                screenshot_path = await automation.take_screenshot(args.url)
 
-        # Извлечение данных
-        articles_data = await automation.extract_articles_data(args.keywords)
+            # Извлечение данных
+            articles_data = await automation.extract_articles_data(keywords)
 
         # Сохранение и вывод статистики
-        if articles_data['articles']:
+        if sink:
+            await sink.add_many(articles_data['articles'])
+            await sink.flush_async()
+            sink.print_statistics()
+        elif articles_data['articles']:
             json_file = await automation.save_to_json(articles_data)
             automation.print_statistics(articles_data)
 
+        resource_filter.print_statistics()
+
     except KeyboardInterrupt:
         automation.logger.info("Скрипт прерван пользователем")
     except Exception as e:
         automation.logger.error(f"Ошибка в основном потоке: {e}")
     finally:
         await automation.close()
+        navigator.save()
+        automation.screenshots.print_statistics()
+        export_metrics(metrics, args)
+        if sink:
+            await sink.aclose()
+        if cache:
+            cache.save()
+
+
+async def run_crawl(args):
+    """Параллельный обход списка страниц Habr"""
+    from DZ.browser_pool import BrowserPool
+    from DZ.crawler import HabrCrawler, load_urls
+    from DZ.habr_automation import HabrAutomation
+    from DZ.http_cache import CacheRouter
+    from DZ.http_extractor import HttpArticleExtractor, HttpConnectionPool
+    from DZ.log_setup import configure_logging
+    from DZ.metrics import MetricsRegistry
+
+    configure_logging(json_format=args.log_json)
+    urls = load_urls(args.urls, args.urls_file, args.page_template, args.pages)
+    if not urls:
+        print("❌ Не задано ни одного URL для обхода")
+        return
+
+    print(f"🕷️  Обход {len(urls)} страниц (параллельно: {args.concurrency})...")
+
+    pool = BrowserPool(size=args.pool_size, contexts_per_browser=args.contexts,
+                       headless=args.headless)
+    resource_filter = build_resource_filter(args)
+    cache = build_cache(args)
+    cache_router = CacheRouter(cache, args.cache_mode) if cache else None
+    metrics = MetricsRegistry()
+    http_extractor = None
+    if args.backend != 'browser':
+        http_extractor = HttpArticleExtractor(HttpConnectionPool(cache=cache, cache_mode=args.cache_mode,
+                                                                 metrics=metrics))
+    sink = build_sink(args)
+    crawler = HabrCrawler(pool, concurrency=args.concurrency,
+                          requests_per_second=args.rate, keywords=args.keywords,
+                          resource_filter=resource_filter, http_extractor=http_extractor,
+                          cache_router=cache_router, sink=sink, metrics=metrics,
+                          navigator=build_navigator(args))
+    automation = HabrAutomation()
+
+    try:
+        # В режиме auto браузеры запускаются лениво, только если HTTP не справился
+        if not http_extractor:
+            await pool.start()
+        articles_data = await crawler.crawl(urls)
+
+        if sink:
+            await sink.flush_async()
+            sink.print_statistics()
+        elif articles_data['articles']:
+            await automation.save_to_json(articles_data)
+            automation.print_statistics(articles_data)
+
+        stats = articles_data['crawl_stats']
+        print(f"⏱️  Страниц: {stats['pages_ok']} успешно, {stats['pages_failed']} с ошибкой "
+              f"за {stats['elapsed_seconds']} с ({stats['pages_per_minute']} стр/мин)")
+        resource_filter.print_statistics()
+
+    except KeyboardInterrupt:
+        automation.logger.info("Обход прерван пользователем")
+    except Exception as e:
+        automation.logger.error(f"Ошибка при обходе: {e}")
+    finally:
+        if http_extractor:
+            http_extractor.close()
+        await pool.close()
+        if sink:
+            await sink.aclose()
+        if cache:
+            cache.save()
+        export_metrics(metrics, args)
+
+
+def build_generator(args) -> 'CodeDocumentationGenerator':
+    """Создание генератора документации с кешем разбора в директории вывода"""
+    from DZ.code_analyzer import CodeDocumentationGenerator
+
+    cache_file = None if args.no_cache else os.path.join(args.output_dir, '.analysis_cache.pickle')
+    git_cache_file = None if args.no_cache else os.path.join(args.output_dir, '.git_history.json')
+    return CodeDocumentationGenerator(args.project_path, jobs=args.jobs, cache_file=cache_file,
+                                      git_cache_file=git_cache_file)
+
+
+def print_modules(title: str, names) -> None:
+    print(f"{title} ({len(names)}):")
+    for name in sorted(names):
+        print(f"   {name}")
+
+
+def run_import_graph(args):
+    """Построение графа импортов и запросы к нему"""
+    generator = build_generator(args)
+    generator.analyze_project()
+    graph = generator.graph
+    graph.print_summary()
+
+    if args.deps:
+        name = graph.normalize(args.deps)
+        print_modules(f"📥 {name} импортирует", graph.dependencies(name))
+        print_modules("   транзитивно", graph.transitive_dependencies(name))
+    if args.rdeps:
+        name = graph.normalize(args.rdeps)
+        print_modules(f"📤 {name} импортируют", graph.dependents(name))
+    if args.affected:
+        name = graph.normalize(args.affected)
+        print_modules(f"🎯 Изменение {name} затрагивает", graph.affected_by(name))
+    if args.cycles:
+        cycles = graph.cycles()
+        if not cycles:
+            print("✅ Циклических импортов нет")
+        for component in cycles:
+            print(f"🔁 Цикл: {' <-> '.join(component)}")
+
+    if args.format:
+        os.makedirs(args.output_dir, exist_ok=True)
+        generator.generate_import_graph(args.output_dir, args.format, args.collapse_depth)
 
 
 def run_code_analysis(args):
     """Запуск анализа кода и генерации документации"""
-    print("🔍 Запуск анализа кода...")
+    if args.analyze_command == 'graph':
+        run_import_graph(args)
+        return
 
-    generator = CodeDocumentationGenerator(args.project_path)
-    generator.analyze_project()
+    print("🔍 Запуск анализа кода...")
 
+    generator = build_generator(args)
     output_dir = args.output_dir
-    generator.generate_markdown_docs(output_dir)
-    generator.generate_json_structure(output_dir)
+    # В режиме наблюдения шарды позволяют переписывать только затронутые пакеты
+    shard_by_package = args.watch if args.shard_by_package is None else args.shard_by_package
+    watcher = None
+    if args.watch:
+        from DZ.doc_watcher import DocWatcher
+
+        # Снимок файлов до первого разбора: правки во время сборки попадут в первое обновление
+        watcher = DocWatcher(generator, output_dir, shard_by_package=shard_by_package,
+                             interval=args.interval, graph_format=args.graph_format)
+
+    generator.analyze_project()
+    generator.generate_markdown_docs(output_dir, shard_by_package=shard_by_package)
+    generator.generate_json_structure(output_dir, shard_by_package=shard_by_package)
     generator.generate_uml_diagram(output_dir)
+    if args.graph_format:
+        generator.generate_import_graph(output_dir, args.graph_format)
 
     print("✅ Документация успешно сгенерирована!")
     print(f"📁 Файлы сохранены в: {output_dir}/")
 
+    if watcher:
+        watcher.run()
+
+
+def run_benchmark(args):
+    """Бенчмарки анализатора и извлечения статей с сравнением с эталоном"""
+    from DZ import benchmark
+    from DZ.json_report import save_report
+
+    synthetic = None
+    if not args.project_path:
+        synthetic = {'files': args.files, 'classes': args.classes, 'functions': args.functions,
+                     'methods': args.methods, 'fanout': args.fanout}
+    scraper = None
+    if not args.skip_scraper:
+        scraper = {'pages_dir': args.pages_dir, 'pages': args.pages, 'articles': args.articles,
+                   'rounds': args.rounds, 'concurrency': args.concurrency, 'browser': args.browser}
+
+    print("⏱️  Запуск бенчмарков...")
+    results = benchmark.run_benchmarks(project_path=args.project_path, synthetic=synthetic,
+                                       repeat=args.repeat, scraper=scraper, jobs=args.jobs)
+    benchmark.print_results(results)
+
+    save_report(results, args.output)
+    print(f"💾 Результаты сохранены в: {args.output}")
+    if args.save_baseline:
+        save_report(results, args.save_baseline)
+        print(f"📌 Эталон сохранен в: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = benchmark.compare_with_baseline(results, baseline, args.tolerance)
+        benchmark.print_comparison(comparison)
+        if benchmark.comparison_failed(comparison):
+            sys.exit(1)
+
+
+async def run_load_test(args):
+    """Нагрузочный тест страницы оплаты с заглушкой бэкенда"""
+    from DZ.json_report import save_report
+    from DZ.metrics import MetricsRegistry
+    from DZ.payment_load_test import (PaymentBackendStub, PaymentLoadTest, parse_mix,
+                                      print_report as print_load_report)
+
+    backend = PaymentBackendStub(args.page, latency_ms=args.backend_latency_ms,
+                                 failure_rate=args.backend_failure_rate)
+    url = backend.start()
+    print(f"🛒 Страница оплаты: {url} ({args.users} пользователей)")
+
+    metrics = MetricsRegistry(prefix='checkout')
+    load_test = PaymentLoadTest(url, users=args.users, concurrency=args.concurrency,
+                                browsers=args.browsers, mix=parse_mix(args.mix),
+                                timer_scale=args.timer_scale, headless=args.headless,
+                                metrics=metrics)
+    try:
+        report = await load_test.run()
+    finally:
+        backend.stop()
+    report['backend'] = backend.stats()
+    print_load_report(report)
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"💾 Отчет сохранен в: {args.output}")
+    if args.metrics_file:
+        metrics.export(args.metrics_file)
+        print(f"📈 Метрики сохранены в: {args.metrics_file}")
+
+
+def run_import_budget(args):
+    """Проверка времени импорта подкоманд; при превышении бюджета код выхода 1"""
+    from DZ.import_budget import check_commands, has_violations, print_reports
+    from DZ.json_report import save_report
+
+    print("⏱️  Замер времени импорта подкоманд...")
+    try:
+        reports = check_commands(args.commands, budget_ms=args.budget_ms, repeat=args.repeat,
+                                 top=args.top, scale=args.budget_scale)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_reports(reports)
+    if args.output:
+        save_report(reports, args.output)
+    if has_violations(reports):
+        sys.exit(1)
+
+
+# Обработчики подкоманд; по импортам внутри них import_budget определяет,
+# какие модули загружает каждая подкоманда
+COMMAND_HANDLERS = {
+    'habr': run_habr_automation,
+    'crawl': run_crawl,
+    'analyze': run_code_analysis,
+    'bench': run_benchmark,
+    'loadtest': run_load_test,
+    'importtime': run_import_budget,
+}
+
 
 def main():
     """Основная функция"""
@@ -68,20 +454,150 @@ def main():
     habr_parser.add_argument('--headless', action='store_true', default=True, help='Headless режим')
     habr_parser.add_argument('--keywords', nargs='+', help='Ключевые слова для фильтрации')
     habr_parser.add_argument('--screenshot', action='store_true', default=True, help='Создавать скриншот')
+    habr_parser.add_argument('--no-screenshot', dest='screenshot', action='store_false', help='Не создавать скриншот')
+    habr_parser.add_argument('--screenshot-format', choices=SCREENSHOT_FORMATS, default='png',
+                             help='Формат скриншота (webp требует Pillow)')
+    habr_parser.add_argument('--screenshot-quality', type=int, help='Качество JPEG/WebP (0-100)')
+    habr_parser.add_argument('--screenshot-mode', choices=SCREENSHOT_MODES, default='full',
+                             help='Вся страница, только окно или один элемент')
+    habr_parser.add_argument('--screenshot-selector', help='Селектор элемента для режима element')
+    habr_parser.add_argument('--screenshot-max-height', type=int, help='Максимальная высота снимка, px')
+    habr_parser.add_argument('--screenshot-thumbnail', type=int, help='Ширина миниатюры, px (требует Pillow)')
+    habr_parser.add_argument('--backend', choices=['auto', 'http', 'browser'], default='auto',
+                             help='Способ извлечения: HTTP+lxml, браузер или HTTP с откатом на браузер '
+                                  '(auto идет по HTTP только с --no-screenshot, т.к. скриншот по умолчанию включен)')
+    add_resource_filter_arguments(habr_parser)
+    add_cache_arguments(habr_parser)
+    add_output_arguments(habr_parser)
+    habr_parser.add_argument('--metrics-file', help='Файл метрик: .json или .prom (Prometheus)')
+    habr_parser.add_argument('--log-json', action='store_true', help='Структурированный лог в формате JSON')
+    habr_parser.add_argument('--nav-stats', metavar='FILE',
+                             help='Файл статистики навигации между запусками '
+                                  '(по умолчанию navigation_stats.json в --cache-dir)')
+    habr_parser.add_argument('--no-nav-stats', action='store_true', help='Не сохранять статистику навигации')
+
+    # Парсер для параллельного обхода
+    crawl_parser = subparsers.add_parser('crawl', help='Параллельный обход списка страниц Habr')
+    crawl_parser.add_argument('--urls', nargs='+', help='Список URL для обхода')
+    crawl_parser.add_argument('--urls-file', help='Файл со списком URL (по одному на строку)')
+    crawl_parser.add_argument('--page-template', default='https://habr.com/ru/articles/page{N}/',
+                              help='Шаблон URL пагинации, {N} - номер страницы')
+    crawl_parser.add_argument('--pages', help='Диапазон страниц для шаблона, например 1-50')
+    crawl_parser.add_argument('--concurrency', type=int, default=4, help='Число одновременно открытых страниц')
+    crawl_parser.add_argument('--rate', type=float, default=2.0, help='Запросов в секунду на один хост')
+    crawl_parser.add_argument('--pool-size', type=int, default=1, help='Число браузеров в пуле')
+    crawl_parser.add_argument('--contexts', type=int, default=4, help='Число контекстов на браузер')
+    crawl_parser.add_argument('--headless', action='store_true', default=True, help='Headless режим')
+    crawl_parser.add_argument('--keywords', nargs='+', help='Ключевые слова для фильтрации')
+    crawl_parser.add_argument('--backend', choices=['auto', 'browser'], default='auto',
+                              help='auto - сначала HTTP+lxml, браузер только для страниц с JS')
+    add_resource_filter_arguments(crawl_parser)
+    add_cache_arguments(crawl_parser)
+    add_output_arguments(crawl_parser)
+    crawl_parser.add_argument('--metrics-file', help='Файл метрик: .json или .prom (Prometheus)')
+    crawl_parser.add_argument('--log-json', action='store_true', help='Структурированный лог в формате JSON')
+    crawl_parser.add_argument('--nav-stats', metavar='FILE',
+                              help='Файл статистики навигации между запусками '
+                                   '(по умолчанию navigation_stats.json в --cache-dir)')
+    crawl_parser.add_argument('--no-nav-stats', action='store_true', help='Не сохранять статистику навигации')
 
     # Парсер для анализа кода
     code_parser = subparsers.add_parser('analyze', help='Анализ кода и генерация документации')
     code_parser.add_argument('--project-path', default='.', help='Путь к проекту')
     code_parser.add_argument('--output-dir', default='docs', help='Директория для документации')
+    code_parser.add_argument('--jobs', '-j', type=int, default=1,
+                             help='Число процессов для разбора файлов (0 - по числу ядер)')
+    code_parser.add_argument('--no-cache', action='store_true',
+                             help='Не использовать кеш разбора (полный повторный анализ)')
+    code_parser.add_argument('--shard-by-package', action=argparse.BooleanOptionalAction,
+                             help='API reference и JSON отдельным файлом на каждый пакет '
+                                  '(по умолчанию включено с --watch)')
+    code_parser.add_argument('--watch', action='store_true',
+                             help='Следить за изменениями и обновлять документацию')
+    code_parser.add_argument('--interval', type=float, default=1.0, help='Период опроса файлов в режиме --watch, с')
+    code_parser.add_argument('--graph-format', choices=GRAPH_FORMATS,
+                             help='Записывать граф импортов import_graph.<формат>; с --watch обновляется '
+                                  'при изменении импортов')
+    analyze_subparsers = code_parser.add_subparsers(dest='analyze_command')
+
+    # Граф импортов: analyze [--project-path ...] graph [запросы]
+    graph_parser = analyze_subparsers.add_parser('graph', help='Граф импортов между модулями проекта')
+    graph_parser.add_argument('--deps', metavar='MODULE', help='Прямые и транзитивные зависимости модуля')
+    graph_parser.add_argument('--rdeps', metavar='MODULE', help='Модули, импортирующие данный')
+    graph_parser.add_argument('--affected', metavar='MODULE', help='Все модули, затронутые изменением данного')
+    graph_parser.add_argument('--cycles', action='store_true', help='Показать циклические импорты')
+    graph_parser.add_argument('--format', choices=GRAPH_FORMATS, help='Записать граф в файл import_graph.<формат>')
+    graph_parser.add_argument('--collapse-depth', type=int, default=0,
+                              help='Свернуть модули до пакетов по первым N частям имени')
+
+    # Парсер для бенчмарков
+    bench_parser = subparsers.add_parser('bench', help='Бенчмарки анализатора и извлечения статей')
+    bench_parser.add_argument('--project-path', help='Замерять на существующем проекте вместо синтетического')
+    bench_parser.add_argument('--files', type=int, default=200, help='Синтетический проект: число модулей')
+    bench_parser.add_argument('--classes', type=int, default=3, help='Классов в модуле')
+    bench_parser.add_argument('--functions', type=int, default=5, help='Функций в модуле')
+    bench_parser.add_argument('--methods', type=int, default=4, help='Методов в классе')
+    bench_parser.add_argument('--fanout', type=int, default=3, help='Импортов других модулей проекта в модуле')
+    bench_parser.add_argument('--repeat', type=int, default=3, help='Число повторов для замера времени')
+    bench_parser.add_argument('--jobs', '-j', type=int, default=1,
+                              help='Число процессов для разбора файлов (0 - по числу ядер)')
+    bench_parser.add_argument('--skip-scraper', action='store_true', help='Не замерять извлечение статей')
+    bench_parser.add_argument('--pages-dir', help='Директория с сохраненными страницами Habr (.html)')
+    bench_parser.add_argument('--pages', type=int, default=20, help='Число синтетических страниц ленты')
+    bench_parser.add_argument('--articles', type=int, default=20, help='Статей на синтетической странице')
+    bench_parser.add_argument('--rounds', type=int, default=3, help='Сколько раз пройти по всем страницам')
+    bench_parser.add_argument('--concurrency', type=int, default=4, help='Одновременных HTTP-запросов')
+    bench_parser.add_argument('--browser', action='store_true', help='Замерить также навигацию в браузере')
+    bench_parser.add_argument('--output', default='benchmarks/results.json', help='Файл результатов (JSON)')
+    bench_parser.add_argument('--baseline', help='Эталон для сравнения; при регрессии код выхода 1')
+    bench_parser.add_argument('--save-baseline', help='Сохранить результаты также как эталон')
+    bench_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                              help='Допустимое ухудшение относительно эталона (0.2 = 20%%)')
+
+    # Парсер для нагрузочного теста страницы оплаты
+    load_parser = subparsers.add_parser('loadtest', help='Нагрузочный тест payment_system.html')
+    load_parser.add_argument('--page', default=PAYMENT_PAGE, help='HTML-страница оплаты')
+    load_parser.add_argument('--users', type=int, default=100, help='Число моделируемых пользователей')
+    load_parser.add_argument('--concurrency', type=int, default=20, help='Одновременно активных пользователей')
+    load_parser.add_argument('--browsers', type=int, default=2, help='Число процессов браузера')
+    load_parser.add_argument('--mix', help='Доли сценариев, например pay=60,cancel=25,interrupt=15')
+    load_parser.add_argument('--backend-latency-ms', type=float, default=50.0, help='Задержка заглушки бэкенда, мс')
+    load_parser.add_argument('--backend-failure-rate', type=float, default=0.0,
+                             help='Доля отказов бэкенда (0-1)')
+    load_parser.add_argument('--timer-scale', type=float, default=1.0,
+                             help='Множитель таймеров страницы (0.1 - в 10 раз быстрее)')
+    load_parser.add_argument('--headless', action='store_true', default=True, help='Headless режим')
+    load_parser.add_argument('--output', default='results/payment_load_test.json', help='Файл отчета (JSON)')
+    load_parser.add_argument('--metrics-file', help='Файл метрик: .json или .prom (Prometheus)')
+
+    # Парсер для проверки времени запуска
+    importtime_parser = subparsers.add_parser('importtime', help='Проверка бюджета времени импорта подкоманд')
+    importtime_parser.add_argument('--command', dest='commands', action='append',
+                                   choices=['cli'] + list(COMMAND_HANDLERS),
+                                   help='Проверяемая подкоманда, можно несколько (по умолчанию все; '
+                                        'cli - только разбор аргументов)')
+    importtime_parser.add_argument('--budget-ms', type=float,
+                                   help='Единый абсолютный бюджет, мс (по умолчанию свой для каждой '
+                                        'подкоманды в долях от времени python -c pass)')
+    importtime_parser.add_argument('--budget-scale', type=float,
+                                   help='Множитель бюджетов для медленных машин '
+                                        '(по умолчанию IMPORT_BUDGET_SCALE или 1)')
+    importtime_parser.add_argument('--repeat', type=int, default=3, help='Число замеров, берется лучший')
+    importtime_parser.add_argument('--top', type=int, default=5, help='Сколько самых тяжелых модулей показывать')
+    importtime_parser.add_argument('--output', help='Сохранить отчет в JSON')
 
     args = parser.parse_args()
 
-    if args.command == 'habr':
-        asyncio.run(run_habr_automation(args))
-    elif args.command == 'analyze':
-        run_code_analysis(args)
-    else:
+    handler = COMMAND_HANDLERS.get(args.command)
+    if handler is None:
         parser.print_help()
+        return
+
+    result = handler(args)
+    if result is not None:
+        # Браузерные подкоманды асинхронные: asyncio загружается только для них
+        import asyncio
+        asyncio.run(result)
 
 
 if __name__ == "__main__":
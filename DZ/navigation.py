@@ -0,0 +1,195 @@
+"""
+Адаптивная навигация: ранний коммит, гонка селекторов и статистика по шаблонам URL
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+# Селекторы, появление любого из которых означает, что контент загружен
+CONTENT_SELECTORS = [
+    'article',
+    '.tm-articles-list',
+    '.tm-article-snippet',
+    '[class*="article"]',
+    '.post__title'
+]
+
+# Состояния ожидания в порядке от самого раннего
+WAIT_STATES = ['commit', 'domcontentloaded', 'load']
+
+# Статистика между запусками хранится рядом с кешем ответов, а не в текущей директории
+NAVIGATION_STATS_FILE = 'navigation_stats.json'
+DEFAULT_STATS_FILE = os.path.join('.habr_cache', NAVIGATION_STATS_FILE)
+
+
+def url_pattern(url: str) -> str:
+    """Шаблон URL для статистики: числа в пути заменяются на {N}"""
+    parsed = urlparse(url)
+    path = re.sub(r'\d+', '{N}', parsed.path or '/')
+    return f"{parsed.netloc}{path}"
+
+
+class NavigationResult:
+    """Результат навигации на одну страницу"""
+
+    def __init__(self, url: str, wait_until: str, selector: Optional[str], elapsed: float,
+                 goto_elapsed: float = 0.0, attempts: int = 1):
+        self.url = url
+        self.wait_until = wait_until
+        self.selector = selector
+        self.elapsed = elapsed
+        # Время перехода (до wait_until) и время ожидания селектора отдельно
+        self.goto_elapsed = goto_elapsed
+        self.selector_elapsed = elapsed - goto_elapsed
+        self.attempts = attempts
+
+
+class NavigationStats:
+    """Статистика успешных состояний ожидания и селекторов по шаблонам URL"""
+
+    def __init__(self, stats_file: Optional[str] = None):
+        self.stats_file = stats_file
+        self.patterns: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                self.patterns = json.load(f)
+        except (OSError, ValueError):
+            self.patterns = {}
+
+    def save(self) -> None:
+        if not self.stats_file:
+            return
+        directory = os.path.dirname(self.stats_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.stats_file, 'w', encoding='utf-8') as f:
+            json.dump(self.patterns, f, ensure_ascii=False, indent=2)
+
+    def _entry(self, pattern: str) -> Dict:
+        return self.patterns.setdefault(pattern, {'wait_states': {}, 'selectors': {}})
+
+    def record_wait(self, pattern: str, wait_until: str, ok: bool) -> None:
+        counters = self._entry(pattern)['wait_states'].setdefault(wait_until, {'ok': 0, 'failed': 0})
+        counters['ok' if ok else 'failed'] += 1
+
+    def record_selector(self, pattern: str, selector: str) -> None:
+        selectors = self._entry(pattern)['selectors']
+        selectors[selector] = selectors.get(selector, 0) + 1
+
+    def wait_order(self, pattern: str) -> List[str]:
+        """Состояния ожидания: сначала самое успешное, затем остальные по порядку"""
+        counters = self.patterns.get(pattern, {}).get('wait_states', {})
+        return sorted(WAIT_STATES, key=lambda state: (
+            -(counters.get(state, {}).get('ok', 0) - counters.get(state, {}).get('failed', 0)),
+            WAIT_STATES.index(state)
+        ))
+
+    def best_selector(self, pattern: str) -> Optional[str]:
+        selectors = self.patterns.get(pattern, {}).get('selectors', {})
+        if not selectors:
+            return None
+        return max(selectors.items(), key=lambda x: x[1])[0]
+
+
+class AdaptiveNavigator:
+    """
+    Навигация без ожидания networkidle: переход завершается на commit/domcontentloaded,
+    затем все селекторы контента ожидаются одновременно до первого совпадения.
+    Лучший селектор для шаблона URL сначала проверяется отдельно с коротким таймаутом.
+    """
+
+    def __init__(self, stats_file: Optional[str] = DEFAULT_STATS_FILE,
+                 selectors: Optional[List[str]] = None, timeout: int = 40000,
+                 selector_timeout: int = 10000, fast_timeout: int = 3000):
+        self.stats = NavigationStats(stats_file)
+        self.selectors = selectors or CONTENT_SELECTORS
+        self.timeout = timeout
+        self.selector_timeout = selector_timeout
+        self.fast_timeout = fast_timeout
+        self.logger = logging.getLogger(__name__)
+
+    async def navigate(self, page, url: str) -> NavigationResult:
+        """Переход на URL и ожидание первого появившегося селектора контента"""
+        pattern = url_pattern(url)
+        started = time.monotonic()
+
+        wait_until, attempts = await self._goto(page, url, pattern)
+        goto_elapsed = time.monotonic() - started
+        selector = await self._wait_for_content(page, pattern)
+
+        elapsed = time.monotonic() - started
+        timing = {'url': url, 'phase': 'navigation', 'elapsed_ms': round(elapsed * 1000, 1),
+                  'wait_until': wait_until, 'selector': selector}
+        if selector:
+            self.logger.info(f"Найден селектор: {selector} ({wait_until}, {elapsed:.2f} с)", extra=timing)
+        else:
+            self.logger.warning("Не удалось найти ожидаемые элементы на странице", extra=timing)
+
+        return NavigationResult(url, wait_until, selector, elapsed, goto_elapsed, attempts)
+
+    async def _goto(self, page, url: str, pattern: str):
+        """Переход с перебором состояний ожидания; возвращает состояние и число попыток"""
+        last_error = None
+        for attempt, wait_until in enumerate(self.stats.wait_order(pattern), 1):
+            try:
+                await page.goto(url, wait_until=wait_until, timeout=self.timeout)
+                self.stats.record_wait(pattern, wait_until, True)
+                return wait_until, attempt
+            except Exception as e:
+                self.logger.warning(f"Переход с wait_until={wait_until} не удался: {e}")
+                self.stats.record_wait(pattern, wait_until, False)
+                last_error = e
+        raise last_error
+
+    async def _wait_for_content(self, page, pattern: str) -> Optional[str]:
+        best = self.stats.best_selector(pattern)
+        if best in self.selectors:
+            try:
+                await page.wait_for_selector(best, timeout=self.fast_timeout)
+                self.stats.record_selector(pattern, best)
+                return best
+            except Exception:
+                pass
+
+        selector = await self._race_selectors(page)
+        if selector:
+            self.stats.record_selector(pattern, selector)
+        return selector
+
+    async def _race_selectors(self, page) -> Optional[str]:
+        """Одновременное ожидание всех селекторов, возврат первого найденного"""
+        tasks = {
+            asyncio.create_task(page.wait_for_selector(selector, timeout=self.selector_timeout)): selector
+            for selector in self.selectors
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.exception():
+                        return tasks[task]
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            # Забираем исключения отмененных задач, чтобы не было предупреждений
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def save(self) -> None:
+        """Сохранение статистики для следующих запусков"""
+        try:
+            self.stats.save()
+        except OSError as e:
+            self.logger.warning(f"Не удалось сохранить статистику навигации: {e}")
@@ -0,0 +1,409 @@
+"""
+Нагрузочное тестирование страницы оплаты payment_system.html: локальный
+сервер с заглушкой платежного бэкенда и параллельные пользователи в
+изолированных контекстах браузера
+"""
+
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from DZ.browser_pool import BROWSER_ARGS, CONTEXT_OPTIONS
+from DZ.cli_options import PAYMENT_PAGE
+from DZ.metrics import MetricsRegistry, percentile
+
+SCENARIOS = ['pay', 'cancel', 'interrupt']
+DEFAULT_MIX = {'pay': 60, 'cancel': 25, 'interrupt': 15}
+BACKEND_ACTIONS = ['init', 'process', 'cancel']
+
+# Перцентили задержек в отчете
+REPORT_PERCENTILES = (50, 90, 95, 99)
+
+# Инструментирование страницы до ее скриптов. Страница имитирует оплату
+# таймерами и не обращается к серверу, поэтому обработчики кнопок
+# оборачиваются вызовами заглушки бэкенда: init и process ждут ответа
+# (ошибка показывает окно ошибки), cancel отправляется без ожидания.
+# Таймеры страницы можно ускорить множителем timer_scale.
+INSTRUMENT_JS = """
+(() => {
+    const timerScale = %(timer_scale)s;
+    if (timerScale !== 1) {
+        const originalSetTimeout = window.setTimeout.bind(window);
+        window.setTimeout = (callback, delay, ...args) =>
+            originalSetTimeout(callback, (delay || 0) * timerScale, ...args);
+    }
+
+    const callBackend = (action) => fetch('/api/payments/' + action, {method: 'POST'})
+        .then((response) => {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+        });
+
+    const showError = () => {
+        document.getElementById('errorModal').style.display = 'flex';
+        window.resetPaymentForm();
+    };
+
+    const wrap = (name, action, blocking) => {
+        const original = window[name];
+        if (typeof original !== 'function') {
+            return;
+        }
+        window[name] = function (...args) {
+            if (!blocking) {
+                callBackend(action).catch(() => {});
+                return original.apply(this, args);
+            }
+            callBackend(action).then(() => original.apply(this, args), showError);
+        };
+    };
+
+    window.addEventListener('DOMContentLoaded', () => {
+        wrap('initPayment', 'init', true);
+        wrap('processPayment', 'process', true);
+        wrap('cancelPayment', 'cancel', false);
+    });
+})();
+"""
+
+# Какое из окон результата показано (или null, пока оба скрыты)
+VISIBLE_MODAL_JS = """
+() => ['successModal', 'errorModal'].find(
+    (id) => getComputedStyle(document.getElementById(id)).display !== 'none') || null
+"""
+
+# Форма оплаты или окно ошибки после нажатия "Купить"
+BUY_RESULT_JS = """
+() => {
+    if (getComputedStyle(document.getElementById('paymentForm')).display !== 'none') return 'form';
+    if (getComputedStyle(document.getElementById('errorModal')).display !== 'none') return 'error';
+    return null;
+}
+"""
+
+PAYMENT_STATE_JS = "() => JSON.parse(localStorage.getItem('paymentState') || 'null')"
+
+
+class StepError(Exception):
+    """Ошибка шага сценария с типом для статистики"""
+
+    def __init__(self, kind: str, message: str = ''):
+        super().__init__(message or kind)
+        self.kind = kind
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """Доли сценариев из строки вида pay=60,cancel=25,interrupt=15"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Неизвестный сценарий: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class PaymentBackendStub:
+    """
+    Локальный сервер: отдает страницу оплаты и отвечает на
+    POST /api/payments/<init|process|cancel> с заданной задержкой
+    и долей отказов. Ведет собственную статистику задержек.
+    """
+
+    def __init__(self, page_path: str = PAYMENT_PAGE, latency_ms: float = 50.0,
+                 jitter_ms: float = 20.0, failure_rate: float = 0.0, seed: int = 0):
+        with open(page_path, 'rb') as f:
+            self.page = f.read()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {action: 0 for action in BACKEND_ACTIONS}
+        self.failures: Dict[str, int] = {action: 0 for action in BACKEND_ACTIONS}
+        self.latencies: Dict[str, List[float]] = {action: [] for action in BACKEND_ACTIONS}
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path in ('/', '/index.html', '/payment_system.html'):
+                    self._send(200, stub.page, 'text/html; charset=utf-8')
+                else:
+                    self._send(404, b'', 'text/plain')
+
+            def do_POST(self):
+                action = self.path.rstrip('/').rsplit('/', 1)[-1]
+                if not self.path.startswith('/api/payments/') or action not in BACKEND_ACTIONS:
+                    self._send(404, b'', 'text/plain')
+                    return
+                status, body = stub.handle(action)
+                self._send(status, json.dumps(body).encode('utf-8'), 'application/json')
+
+        return Handler
+
+    def handle(self, action: str):
+        """Обработка вызова бэкенда: задержка и, с заданной вероятностью, отказ"""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self._random.random() < self.failure_rate
+        started = time.monotonic()
+        time.sleep(delay)
+        with self._lock:
+            self.requests[action] += 1
+            self.latencies[action].append(time.monotonic() - started)
+            if failed:
+                self.failures[action] += 1
+        if failed:
+            return 502, {'status': 'error', 'action': action}
+        return 200, {'status': 'ok', 'action': action}
+
+    def start(self) -> str:
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                action: {
+                    'requests': self.requests[action],
+                    'failures': self.failures[action],
+                    'latency_ms_p50': round(percentile(self.latencies[action], 50) * 1000, 2),
+                    'latency_ms_p95': round(percentile(self.latencies[action], 95) * 1000, 2)
+                }
+                for action in BACKEND_ACTIONS
+            }
+
+
+class PaymentLoadTest:
+    """
+    Параллельные пользователи проходят сценарии покупки: оплата, отмена
+    или уход со страницы посреди оплаты. Каждый пользователь получает
+    собственный контекст браузера (отдельные cookies и localStorage);
+    браузеры запускаются с параметрами HabrAutomation.
+    """
+
+    def __init__(self, url: str, users: int = 100, concurrency: int = 20, browsers: int = 2,
+                 mix: Optional[Dict[str, int]] = None, timer_scale: float = 1.0,
+                 step_timeout: float = 30.0, headless: bool = True, seed: int = 0,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.url = url
+        self.users = users
+        self.concurrency = concurrency
+        self.browsers = max(1, browsers)
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.timer_scale = timer_scale
+        self.step_timeout_ms = step_timeout * 1000
+        self.headless = headless
+        self.metrics = metrics or MetricsRegistry(prefix='checkout')
+        self._random = random.Random(seed)
+
+        self.latencies: Dict[str, List[float]] = {}
+        self.step_errors: Dict[str, Dict[str, int]] = {}
+        self.scenario_results: Dict[str, Dict[str, int]] = {
+            name: {'started': 0, 'succeeded': 0, 'failed': 0} for name in SCENARIOS
+        }
+        self.elapsed = 0.0
+
+    def _pick_scenario(self) -> str:
+        names = [name for name in SCENARIOS if self.mix.get(name)]
+        return self._random.choices(names, weights=[self.mix[name] for name in names])[0]
+
+    async def _step(self, name: str, action) -> Any:
+        """Замер шага; ошибки считаются по типу"""
+        started = time.monotonic()
+        try:
+            result = await action()
+        except StepError as e:
+            self._record_error(name, e.kind)
+            raise
+        except Exception as e:
+            kind = 'timeout' if 'Timeout' in type(e).__name__ else 'browser'
+            self._record_error(name, kind)
+            raise StepError(kind, str(e)) from e
+        elapsed = time.monotonic() - started
+        self.latencies.setdefault(name, []).append(elapsed)
+        self.metrics.observe('step_duration_seconds', elapsed, step=name)
+        return result
+
+    def _record_error(self, step: str, kind: str) -> None:
+        errors = self.step_errors.setdefault(step, {})
+        errors[kind] = errors.get(kind, 0) + 1
+        self.metrics.inc('step_errors', step=step, kind=kind)
+
+    async def _load(self, page) -> None:
+        await page.goto(self.url, wait_until='domcontentloaded')
+        await page.wait_for_selector('#buyButton', state='visible')
+
+    async def _buy(self, page) -> None:
+        await page.click('#buyButton')
+        handle = await page.wait_for_function(BUY_RESULT_JS, timeout=self.step_timeout_ms)
+        if await handle.json_value() != 'form':
+            raise StepError('init_failed')
+
+    async def _pay(self, page) -> None:
+        await page.click('#paymentForm button:has-text("Оплатить")')
+        handle = await page.wait_for_function(VISIBLE_MODAL_JS, timeout=self.step_timeout_ms)
+        if await handle.json_value() != 'successModal':
+            raise StepError('declined')
+        state = await page.evaluate(PAYMENT_STATE_JS)
+        if not state or not state.get('completed'):
+            raise StepError('state')
+
+    async def _cancel(self, page) -> None:
+        await page.click('#paymentForm button:has-text("Отмена")')
+        await page.wait_for_selector('#errorModal', state='visible')
+        state = await page.evaluate(PAYMENT_STATE_JS)
+        if not state or state.get('initiated'):
+            raise StepError('state')
+
+    async def _interrupt(self, page) -> None:
+        # Уход со страницы посреди оплаты: срабатывает beforeunload, затем
+        # страница должна загрузиться заново с незавершенным платежом в localStorage
+        await page.reload(wait_until='domcontentloaded')
+        await page.wait_for_selector('#buyButton', state='visible')
+        state = await page.evaluate(PAYMENT_STATE_JS)
+        if not state or state.get('completed'):
+            raise StepError('state')
+
+    async def _run_user(self, browser, scenario: str) -> None:
+        result = self.scenario_results[scenario]
+        result['started'] += 1
+        context = None
+
+        async def open_page():
+            nonlocal context
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            await context.add_init_script(INSTRUMENT_JS % {'timer_scale': self.timer_scale})
+            page = await context.new_page()
+            page.set_default_timeout(self.step_timeout_ms)
+            page.on('dialog', lambda dialog: dialog.accept())
+            return page
+
+        try:
+            # Контекст и страница - отдельный шаг: упавший браузер считается его ошибкой
+            page = await self._step('setup', open_page)
+            await self._step('load', lambda: self._load(page))
+            await self._step('buy', lambda: self._buy(page))
+            if scenario == 'pay':
+                await self._step('pay', lambda: self._pay(page))
+            elif scenario == 'cancel':
+                await self._step('cancel', lambda: self._cancel(page))
+            else:
+                await self._step('interrupt', lambda: self._interrupt(page))
+            result['succeeded'] += 1
+        except StepError:
+            result['failed'] += 1
+        except Exception:
+            # Сбой вне шагов не должен прерывать остальных пользователей
+            self._record_error('setup', 'browser')
+            result['failed'] += 1
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass  # браузер уже закрыт или упал
+
+    async def run(self) -> Dict[str, Any]:
+        from playwright.async_api import async_playwright
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with async_playwright() as playwright:
+            browsers = [
+                await playwright.chromium.launch(headless=self.headless, args=BROWSER_ARGS)
+                for _ in range(self.browsers)
+            ]
+
+            async def user(index: int) -> None:
+                async with semaphore:
+                    await self._run_user(browsers[index % len(browsers)], self._pick_scenario())
+
+            started = time.monotonic()
+            try:
+                await asyncio.gather(*(user(index) for index in range(self.users)))
+            finally:
+                self.elapsed = time.monotonic() - started
+                for browser in browsers:
+                    await browser.close()
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        steps = {}
+        for name in ['setup', 'load', 'buy'] + SCENARIOS:
+            latencies = self.latencies.get(name, [])
+            errors = self.step_errors.get(name, {})
+            total = len(latencies) + sum(errors.values())
+            if not total:
+                continue
+            step = {
+                'count': total,
+                'errors': errors,
+                'error_rate': round(sum(errors.values()) / total, 4)
+            }
+            for q in REPORT_PERCENTILES:
+                step[f"latency_ms_p{q}"] = round(percentile(latencies, q) * 1000, 1)
+            step['latency_ms_max'] = round(max(latencies, default=0.0) * 1000, 1)
+            steps[name] = step
+
+        completed = sum(result['succeeded'] + result['failed'] for result in self.scenario_results.values())
+        failed = sum(result['failed'] for result in self.scenario_results.values())
+        return {
+            'users': self.users,
+            'concurrency': self.concurrency,
+            'browsers': self.browsers,
+            'timer_scale': self.timer_scale,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'users_per_second': round(completed / self.elapsed, 2) if self.elapsed else 0.0,
+            'error_rate': round(failed / completed, 4) if completed else 0.0,
+            'scenarios': self.scenario_results,
+            'steps': steps
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"🛒 Пользователей: {report['users']} (параллельно {report['concurrency']}, "
+          f"браузеров {report['browsers']}) за {report['elapsed_seconds']} с, "
+          f"{report['users_per_second']} польз/с, ошибок {report['error_rate']:.1%}")
+    for name, result in report['scenarios'].items():
+        if result['started']:
+            print(f"   сценарий {name}: {result['succeeded']} успешно, {result['failed']} с ошибкой")
+    for name, step in report['steps'].items():
+        errors = ', '.join(f"{kind}: {count}" for kind, count in step['errors'].items()) or 'нет'
+        print(f"   {name:<9} p50 {step['latency_ms_p50']} мс, p95 {step['latency_ms_p95']} мс, "
+              f"p99 {step['latency_ms_p99']} мс, ошибки: {errors}")
+    backend = report.get('backend')
+    if backend:
+        for action, stats in backend.items():
+            print(f"   backend {action:<8} {stats['requests']} запросов, отказов {stats['failures']}, "
+                  f"p95 {stats['latency_ms_p95']} мс")
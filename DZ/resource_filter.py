@@ -0,0 +1,141 @@
+"""
+Фильтрация сетевых запросов браузера по типу ресурса и домену
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+from DZ.cli_options import PRESETS
+
+# Счетчики и аналитика, из-за которых networkidle на habr.com не наступает
+TRACKER_DOMAINS = {
+    'mc.yandex.ru', 'an.yandex.ru', 'yastatic.net', 'ads.adfox.ru',
+    'google-analytics.com', 'googletagmanager.com', 'googlesyndication.com',
+    'doubleclick.net', 'top-fwz1.mail.ru', 'counter.yadro.ru',
+    'vk.com', 'facebook.net', 'scorecardresearch.com'
+}
+
+# Типичный размер ответа для оценки сэкономленного трафика, пока нет своих замеров
+DEFAULT_SIZES = {
+    'image': 40000, 'media': 300000, 'font': 50000, 'stylesheet': 30000,
+    'script': 60000, 'xhr': 5000, 'fetch': 5000
+}
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    """Совпадение хоста с доменом или любым его поддоменом"""
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class ResourceFilter:
+    """
+    Фильтр запросов, подключаемый к контексту через context.route.
+    Заблокированные запросы не скачиваются, поэтому их объем оценивается
+    по среднему размеру пропущенных ответов того же типа.
+    """
+
+    def __init__(self, preset: str = 'full', resource_types: Optional[Iterable[str]] = None,
+                 deny_domains: Optional[Iterable[str]] = None,
+                 allow_domains: Optional[Iterable[str]] = None):
+        if preset not in PRESETS:
+            raise ValueError(f"Неизвестная предустановка фильтра: {preset}")
+
+        config = PRESETS[preset]
+        self.preset = preset
+        self.resource_types = set(config['resource_types']) | set(resource_types or [])
+        self.deny_domains = set(deny_domains or [])
+        if config['block_trackers']:
+            self.deny_domains |= TRACKER_DOMAINS
+        self.allow_domains = set(allow_domains or [])
+        self.logger = logging.getLogger(__name__)
+
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.blocked_by_domain: Dict[str, int] = {}
+        self.bytes_loaded = 0
+        self.blocked_bytes_estimated = 0
+        self._size_totals: Dict[str, list] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.deny_domains or self.allow_domains)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """Решение о блокировке запроса"""
+        if resource_type == 'document':
+            return False
+        if resource_type in self.resource_types:
+            return True
+
+        host = urlparse(url).hostname or ''
+        if self.allow_domains and not _host_matches(host, self.allow_domains):
+            return True
+        return _host_matches(host, self.deny_domains)
+
+    async def install(self, context) -> None:
+        """Подключение фильтра к контексту браузера"""
+        if not self.enabled:
+            return
+        await context.route('**/*', self._handle_route)
+        context.on('response', self._on_response)
+        self.logger.info(f"Фильтр ресурсов включен (preset={self.preset})")
+
+    async def uninstall(self, context) -> None:
+        """Отключение фильтра (для контекстов, возвращаемых в пул)"""
+        if not self.enabled:
+            return
+        await context.unroute('**/*', self._handle_route)
+        context.remove_listener('response', self._on_response)
+
+    async def _handle_route(self, route) -> None:
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self._record_blocked(request.url, request.resource_type)
+            await route.abort('blockedbyclient')
+        else:
+            self.allowed_requests += 1
+            # fallback передает запрос следующему обработчику (например, кешу)
+            await route.fallback()
+
+    def _record_blocked(self, url: str, resource_type: str) -> None:
+        host = urlparse(url).hostname or ''
+        self.blocked_requests += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.blocked_by_domain[host] = self.blocked_by_domain.get(host, 0) + 1
+        self.blocked_bytes_estimated += self._average_size(resource_type)
+
+    def _on_response(self, response) -> None:
+        length = response.headers.get('content-length')
+        if not length or not length.isdigit():
+            return
+        size = int(length)
+        self.bytes_loaded += size
+        totals = self._size_totals.setdefault(response.request.resource_type, [0, 0])
+        totals[0] += size
+        totals[1] += 1
+
+    def _average_size(self, resource_type: str) -> int:
+        total, count = self._size_totals.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return DEFAULT_SIZES.get(resource_type, 10000)
+
+    def stats(self) -> Dict:
+        top_domains = sorted(self.blocked_by_domain.items(), key=lambda x: x[1], reverse=True)[:10]
+        return {
+            'preset': self.preset,
+            'blocked_requests': self.blocked_requests,
+            'allowed_requests': self.allowed_requests,
+            'blocked_by_type': self.blocked_by_type,
+            'blocked_top_domains': dict(top_domains),
+            'bytes_loaded': self.bytes_loaded,
+            'blocked_bytes_estimated': self.blocked_bytes_estimated
+        }
+
+    def print_statistics(self) -> None:
+        """Вывод статистики фильтрации"""
+        if not self.enabled:
+            return
+        print(f"🚫 Заблокировано запросов: {self.blocked_requests} "
+              f"(~{self.blocked_bytes_estimated / 1024:.0f} КБ), пропущено: {self.allowed_requests}")
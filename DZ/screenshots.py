@@ -0,0 +1,156 @@
+"""
+Конвейер скриншотов: выбор формата и области, кодирование и запись вне цикла событий
+"""
+
+import asyncio
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from DZ.cli_options import SCREENSHOT_FORMATS, SCREENSHOT_MODES
+
+
+def _load_pillow():
+    """Модуль PIL.Image или None; Pillow нужен только для WebP и миниатюр и загружается при первом обращении"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+class ScreenshotOptions:
+    """Параметры съемки страницы"""
+
+    def __init__(self, image_format: str = 'png', quality: Optional[int] = None,
+                 mode: str = 'full', selector: Optional[str] = None,
+                 max_height: Optional[int] = None, thumbnail_width: Optional[int] = None):
+        if image_format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Неподдерживаемый формат скриншота: {image_format}")
+        if mode not in SCREENSHOT_MODES:
+            raise ValueError(f"Неизвестный режим скриншота: {mode}")
+        if mode == 'element' and not selector:
+            raise ValueError("Для режима element нужен селектор")
+        if (image_format == 'webp' or thumbnail_width) and _load_pillow() is None:
+            raise ValueError("Для WebP и миниатюр нужен Pillow (pip install Pillow)")
+
+        self.image_format = image_format
+        self.quality = quality
+        self.mode = mode
+        self.selector = selector
+        self.max_height = max_height
+        self.thumbnail_width = thumbnail_width
+
+    @property
+    def extension(self) -> str:
+        return 'jpg' if self.image_format == 'jpeg' else self.image_format
+
+
+class ScreenshotPipeline:
+    """
+    Браузер только снимает кадр; перекодирование, миниатюры и запись на диск
+    выполняются в пуле потоков, а вызывающий код сразу продолжает работу.
+    Незавершенные записи дожидаются в drain().
+    """
+
+    def __init__(self, options: Optional[ScreenshotOptions] = None,
+                 output_dir: str = 'screenshots', max_workers: int = 2):
+        self.options = options or ScreenshotOptions()
+        self.output_dir = output_dir
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='screenshot')
+        self.logger = logging.getLogger(__name__)
+        self.records: List[Dict] = []
+        self._pending: List[asyncio.Future] = []
+
+    async def capture(self, page, url: str) -> str:
+        """Съемка страницы; возвращает путь, запись файла идет в фоне"""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        domain = url.split('//')[-1].split('/')[0].replace('.', '_')
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filename = f"{self.output_dir}/{domain}_{timestamp}.{self.options.extension}"
+
+        started = time.monotonic()
+        data = await self._shoot(page)
+        capture_ms = (time.monotonic() - started) * 1000
+
+        record = {
+            'url': url,
+            'path': filename,
+            'format': self.options.image_format,
+            'mode': self.options.mode,
+            'capture_ms': round(capture_ms, 1),
+            'raw_bytes': len(data)
+        }
+        self.records.append(record)
+
+        loop = asyncio.get_running_loop()
+        self._pending.append(loop.run_in_executor(self.executor, self._encode_and_write, data, filename, record))
+        return filename
+
+    async def _shoot(self, page) -> bytes:
+        options = self.options
+        # WebP браузер не умеет: снимаем PNG без потерь и перекодируем в потоке
+        kwargs = {'type': 'jpeg' if options.image_format == 'jpeg' else 'png'}
+        if options.image_format == 'jpeg' and options.quality:
+            kwargs['quality'] = options.quality
+
+        if options.mode == 'element':
+            element = await page.wait_for_selector(options.selector, timeout=10000)
+            return await element.screenshot(**kwargs)
+
+        if options.mode == 'viewport':
+            return await page.screenshot(**kwargs)
+
+        if options.max_height:
+            width, height = await page.evaluate(
+                "() => [document.documentElement.scrollWidth, document.documentElement.scrollHeight]"
+            )
+            if height > options.max_height:
+                kwargs['clip'] = {'x': 0, 'y': 0, 'width': width, 'height': options.max_height}
+        return await page.screenshot(full_page=True, **kwargs)
+
+    def _encode_and_write(self, data: bytes, filename: str, record: Dict) -> None:
+        started = time.monotonic()
+        options = self.options
+        Image = _load_pillow()
+
+        if options.image_format == 'webp':
+            image = Image.open(io.BytesIO(data))
+            buffer = io.BytesIO()
+            image.save(buffer, format='WEBP', quality=options.quality or 80)
+            data = buffer.getvalue()
+
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+        if options.thumbnail_width:
+            image = Image.open(io.BytesIO(data))
+            height = max(1, image.height * options.thumbnail_width // image.width)
+            image.thumbnail((options.thumbnail_width, height))
+            root, extension = os.path.splitext(filename)
+            image.convert('RGB').save(f"{root}_thumb.jpg", format='JPEG', quality=80)
+
+        record['bytes'] = len(data)
+        record['encode_ms'] = round((time.monotonic() - started) * 1000, 1)
+
+    async def drain(self) -> None:
+        """Ожидание всех фоновых записей"""
+        pending, self._pending = self._pending, []
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, Exception):
+                self.logger.error(f"Ошибка при записи скриншота: {result}")
+
+    async def close(self) -> None:
+        await self.drain()
+        self.executor.shutdown(wait=True)
+
+    def print_statistics(self) -> None:
+        """Вывод времени съемки и размеров файлов"""
+        for record in self.records:
+            size = record.get('bytes', record['raw_bytes'])
+            print(f"📸 {record['path']}: съемка {record['capture_ms']} мс, "
+                  f"запись {record.get('encode_ms', '-')} мс, {size / 1024:.0f} КБ")